@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Post, Category, Location, Comment
+from .models import Post, Category, Location, Comment, ImageJob
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -17,11 +17,18 @@ class PostAdmin(admin.ModelAdmin):
         'author',
         'pub_date',
     )
-    search_fields = ('title',)
+    search_fields = ('title', 'text')
     list_filter = ('category', 'is_published',)
     list_display_links = ('title',)
     empty_value_diplay = 'Не задано'
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        return queryset.search(search_term), False
+
 
 class PostInline(admin.TabularInline):
     model = Post
@@ -37,7 +44,22 @@ class CategoryAdmin(admin.ModelAdmin):
     )
 
 
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'image',
+        'post',
+        'status',
+        'attempts',
+        'run_after',
+        'last_error',
+    )
+    list_filter = ('status',)
+    list_select_related = ('post',)
+    readonly_fields = ('post', 'image', 'created_at')
+
+
 admin.site.register(Post, PostAdmin)
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Location)
 admin.site.register(Comment)
+admin.site.register(ImageJob, ImageJobAdmin)
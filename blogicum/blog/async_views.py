@@ -0,0 +1,106 @@
+"""Асинхронные варианты страниц чтения для развёртывания через ASGI.
+
+Django 3.2 не умеет выполнять запросы ORM из асинхронного кода, поэтому
+независимые друг от друга выборки страницы (версии тегов кэша, дата
+последней публикации, сам объект) запускаются одновременно, каждая
+своим вызовом sync_to_async в отдельном потоке. Остальное синхронное
+представление выполняется в потоке запроса и получает уже готовые
+результаты, так что кэш, валидаторы и контекст страниц по-прежнему
+задаются только в blog/views.py.
+"""
+import asyncio
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+from .views import (
+    CategoryPostsListView, PostDetailView, PostListView, UserDetailView,
+)
+
+
+def run_lookup(lookup):
+    """Выполняет выборку в отдельном потоке и отпускает его соединение.
+
+    Соединения потоков закрываются по тем же правилам CONN_MAX_AGE, что и
+    соединение потока запроса по сигналу конца запроса.
+    """
+    try:
+        return lookup()
+    finally:
+        close_old_connections()
+
+
+def preloaded(value):
+    return lambda *args, **kwargs: value
+
+
+class AsyncPageView:
+    """Корутина для обработчика ASGI поверх синхронного представления.
+
+    concurrent_lookups — имена методов представления, которые не зависят
+    друг от друга и нужны при любом GET-запросе страницы.
+    """
+
+    sync_view_class = None
+    concurrent_lookups = ('get_tag_versions',)
+
+    @classmethod
+    def get_concurrent_lookups(cls, request):
+        return cls.concurrent_lookups
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view_class = cls.sync_view_class
+        view = view_class.as_view(**initkwargs)
+
+        async def async_view(request, *args, **kwargs):
+            self = view_class(**initkwargs)
+            self.setup(request, *args, **kwargs)
+            if request.method in ('GET', 'HEAD'):
+                # Пользователь нужен выборкам, поэтому загружается до них
+                # и один раз.
+                await sync_to_async(lambda: request.user.pk)()
+                names = cls.get_concurrent_lookups(request)
+                results = await asyncio.gather(*(
+                    sync_to_async(run_lookup, thread_sensitive=False)(
+                        getattr(self, name)
+                    )
+                    for name in names
+                ))
+                for name, value in zip(names, results):
+                    setattr(self, name, preloaded(value))
+            return await sync_to_async(self.dispatch)(
+                request, *args, **kwargs
+            )
+
+        return update_wrapper(async_view, view)
+
+
+class AsyncPostListView(AsyncPageView):
+    sync_view_class = PostListView
+    concurrent_lookups = ('get_tag_versions', 'get_latest_pub_date')
+
+
+class AsyncCategoryPostsListView(AsyncPageView):
+    sync_view_class = CategoryPostsListView
+    concurrent_lookups = ('get_tag_versions', 'get_category')
+
+
+class AsyncUserDetailView(AsyncPageView):
+    sync_view_class = UserDetailView
+    concurrent_lookups = (
+        'get_tag_versions', 'get_latest_pub_date', 'get_object',
+    )
+
+
+class AsyncPostDetailView(AsyncPageView):
+    sync_view_class = PostDetailView
+
+    @classmethod
+    def get_concurrent_lookups(cls, request):
+        # Анониму страницу обычно отдаёт кэш, и пост с комментариями
+        # выбирать заранее незачем.
+        if request.user.is_authenticated:
+            return ('get_tag_versions', 'get_object', 'get_comments_page')
+        return cls.concurrent_lookups
@@ -0,0 +1,75 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.routers import reading_replica
+
+POST_COUNT_KEY = 'blog:post_count:{scope}'
+TAG_KEY = 'blog:tag:{tag}'
+PAGE_KEY = 'blog:page:{digest}'
+SHARED_TAGS = ('categories', 'locations')
+
+
+def feed_scope():
+    return 'feed'
+
+
+def author_scope(username, own=False):
+    return f'author:{username}:all' if own else f'author:{username}'
+
+
+def post_count_key(scope):
+    return POST_COUNT_KEY.format(scope=scope)
+
+
+def get_post_count(scope, count_func):
+    key = post_count_key(scope)
+    count = cache.get(key)
+    if count is None:
+        count = count_func()
+        if not reading_replica():
+            cache.set(key, count, settings.POST_COUNT_CACHE_TIMEOUT)
+    return count
+
+
+def invalidate_post_counts(*scopes):
+    cache.delete_many([post_count_key(scope) for scope in set(scopes)])
+
+
+def feed_tag():
+    return 'feed'
+
+
+def category_tag(slug):
+    return f'category:{slug}'
+
+
+def author_tag(username):
+    return f'author:{username}'
+
+
+def post_tag(pk):
+    return f'post:{pk}'
+
+
+def get_tag_versions(tags):
+    """Версии тегов — время их последнего изменения."""
+    keys = {TAG_KEY.format(tag=tag): tag for tag in tags}
+    versions = cache.get_many(keys)
+    missing = {key: time.time() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def touch_tags(*tags):
+    now = time.time()
+    cache.set_many({TAG_KEY.format(tag=tag): now for tag in set(tags)}, None)
+
+
+def page_cache_key(path, versions):
+    raw = ':'.join([path, *(f'{t}={v}' for t, v in sorted(versions.items()))])
+    return PAGE_KEY.format(digest=hashlib.md5(raw.encode()).hexdigest())
@@ -0,0 +1,90 @@
+"""Счётчики видимых публикаций категорий и авторов.
+
+Счётчик хранит количество публикаций, которые видит читатель. Счётчик
+создаётся вместе с категорией или пользователем, а изменения видимости
+публикаций сдвигают его выражением F() при записи, поэтому чтение
+страниц ничего не пишет в базу. Устаревший или отсутствующий счётчик
+(например, после loaddata) заменяется подсчётом до запуска
+rebuild_post_counters.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Category, Post, PostCounter, User
+
+COUNTER_KEYS = {'category': 'slug', 'author': 'username'}
+
+
+def count_posts(field, value):
+    return Post.objects.filter(
+        **{f'{field}__{COUNTER_KEYS[field]}': value}
+    ).default_filters().count()
+
+
+# Внутри транзакции ReplicaRouter читает из основной базы, поэтому в
+# счётчик не попадёт количество с отстающей реплики.
+@transaction.atomic
+def refresh_counter(field, value):
+    owner_model = PostCounter._meta.get_field(field).related_model
+    owner = owner_model.objects.filter(
+        **{COUNTER_KEYS[field]: value}
+    ).first()
+    if owner is None:
+        return None
+    counter, _ = PostCounter.objects.update_or_create(
+        **{field: owner},
+        defaults={
+            'count': count_posts(field, value),
+            'refresh_after': None,
+        },
+    )
+    return counter
+
+
+def get_post_count(field, value):
+    """Количество видимых публикаций категории или автора."""
+    counter = PostCounter.objects.filter(
+        **{f'{field}__{COUNTER_KEYS[field]}': value}
+    ).first()
+    if counter is None or counter.is_stale:
+        return count_posts(field, value)
+    return counter.count
+
+
+def shift_counters(changes):
+    """Сдвигает счётчики на изменения видимости публикаций.
+
+    changes — кортежи (category__slug, author__username, delta), где
+    delta равна 1 для открытой публикации и -1 для скрытой.
+    """
+    deltas = Counter()
+    for category, author, delta in changes:
+        if category:
+            deltas['category', category] += delta
+        if author:
+            deltas['author', author] += delta
+    for (field, value), delta in deltas.items():
+        if delta:
+            PostCounter.objects.filter(
+                **{f'{field}__{COUNTER_KEYS[field]}': value}
+            ).update(count=F('count') + delta)
+
+
+def expire_counters(categories=(), authors=()):
+    PostCounter.objects.filter(
+        Q(category__slug__in=set(categories))
+        | Q(author__username__in=set(authors))
+    ).update(refresh_after=timezone.now())
+
+
+def rebuild_counters():
+    slugs = list(Category.objects.values_list('slug', flat=True))
+    usernames = list(User.objects.values_list('username', flat=True))
+    for slug in slugs:
+        refresh_counter('category', slug)
+    for username in usernames:
+        refresh_counter('author', username)
+    return len(slugs) + len(usernames)
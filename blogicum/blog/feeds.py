@@ -0,0 +1,160 @@
+"""RSS и Atom ленты публикаций сайта, категорий и авторов.
+
+Читатели лент опрашивают их постоянно, поэтому готовый XML хранится в
+кэше под ключом из версий тегов, как и страницы для анонимов: любое
+изменение публикации или открытие отложенной сбрасывает его.
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import parse_http_date_safe
+from django.utils.text import Truncator
+
+from core.routers import reading_replica
+
+from .cache import (
+    SHARED_TAGS, author_tag, category_tag, feed_tag, get_tag_versions,
+    page_cache_key,
+)
+from .models import Category, Post, User
+
+
+class CachedFeed(Feed):
+    """Последние публикации с кэшем готовой ленты и условными запросами.
+
+    cache_tag — функция из blog.cache, которая строит тег ленты из
+    аргументов адреса.
+    """
+
+    description_words = 50
+    cache_tag = None
+
+    def __call__(self, request, *args, **kwargs):
+        versions = get_tag_versions(
+            (self.cache_tag(*kwargs.values()), *SHARED_TAGS)
+        )
+        key = page_cache_key(request.path, versions)
+        response = cache.get(key)
+        if response is None:
+            response = super().__call__(request, *args, **kwargs)
+            if reading_replica():
+                # Лента с отстающей реплики не кэшируется ни здесь, ни у
+                # клиента: валидаторы строятся из текущих версий тегов.
+                if response.has_header('Last-Modified'):
+                    del response['Last-Modified']
+                return response
+            if response.status_code == 200:
+                cache.set(key, response, settings.FEED_CACHE_TIMEOUT)
+        response['ETag'] = f'W/"{hashlib.md5(key.encode()).hexdigest()}"'
+        return get_conditional_response(
+            request,
+            etag=response['ETag'],
+            last_modified=parse_http_date_safe(
+                response.get('Last-Modified')
+            ),
+            response=response,
+        )
+
+    def get_posts(self, obj):
+        return Post.default_filters.order_by('-pub_date')
+
+    def items(self, obj):
+        return self.get_posts(obj)[:settings.FEED_ITEMS]
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return Truncator(item.text).words(self.description_words)
+
+    def item_link(self, item):
+        return reverse('blog:post_detail', args=(item.pk,))
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_author_link(self, item):
+        return reverse('blog:profile', args=(item.author.username,))
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_categories(self, item):
+        return (item.category.title,)
+
+
+class AtomFeedMixin:
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self._get_dynamic_attr('description', obj)
+
+
+class LatestPostsFeed(CachedFeed):
+    title = 'Блогикум'
+    description = 'Новые публикации'
+    cache_tag = staticmethod(feed_tag)
+
+    def link(self):
+        return reverse('blog:index')
+
+
+class CategoryPostsFeed(CachedFeed):
+    cache_tag = staticmethod(category_tag)
+
+    def get_object(self, request, category_slug):
+        return get_object_or_404(
+            Category, slug=category_slug, is_published=True
+        )
+
+    def get_posts(self, category):
+        return super().get_posts(category).filter(category=category)
+
+    def title(self, category):
+        return f'Блогикум — {category.title}'
+
+    def description(self, category):
+        return category.description
+
+    def link(self, category):
+        return reverse('blog:category_posts', args=(category.slug,))
+
+
+class AuthorPostsFeed(CachedFeed):
+    cache_tag = staticmethod(author_tag)
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def get_posts(self, author):
+        return super().get_posts(author).filter(author=author)
+
+    def title(self, author):
+        return f'Блогикум — публикации {author.username}'
+
+    def description(self, author):
+        return f'Новые публикации пользователя {author.username}'
+
+    def link(self, author):
+        return reverse('blog:profile', args=(author.username,))
+
+
+class LatestPostsAtomFeed(AtomFeedMixin, LatestPostsFeed):
+    pass
+
+
+class CategoryPostsAtomFeed(AtomFeedMixin, CategoryPostsFeed):
+    pass
+
+
+class AuthorPostsAtomFeed(AtomFeedMixin, AuthorPostsFeed):
+    pass
@@ -0,0 +1,108 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .cache import author_tag, category_tag, feed_tag, post_tag, touch_tags
+from .images import build_variants, variants_ready
+from .models import ImageJob, Post
+
+Status = ImageJob.Status
+
+
+def enqueue_image_job(post):
+    """Ставит изображение публикации в очередь, если копий ещё нет."""
+    if not post.image or variants_ready(post.image):
+        return None
+    job, _ = ImageJob.objects.get_or_create(
+        post=post,
+        image=post.image.name,
+        status=Status.PENDING,
+    )
+    return job
+
+
+def claim_jobs(limit):
+    """Забирает задачи на выполнение.
+
+    Задача захватывается условным UPDATE, поэтому несколько обработчиков
+    не возьмут одну и ту же задачу. Зависшие задачи возвращаются в работу,
+    когда истекает их аренда, а исчерпавшие попытки — раз в
+    IMAGE_JOB_REQUEUE_INTERVAL сек.
+    """
+    now = timezone.now()
+    candidates = list(ImageJob.objects.filter(
+        status__in=(Status.PENDING, Status.RUNNING, Status.FAILED),
+        run_after__lte=now,
+    ).values_list('pk', 'status', 'run_after')[:limit])
+    lease = now + timedelta(seconds=settings.IMAGE_JOB_LEASE)
+    claimed = []
+    for pk, status, run_after in candidates:
+        if ImageJob.objects.filter(
+            pk=pk, status=status, run_after=run_after
+        ).update(
+            status=Status.RUNNING, run_after=lease, attempts=F('attempts') + 1
+        ):
+            claimed.append(pk)
+    return ImageJob.objects.filter(pk__in=claimed).select_related(
+        'post__author', 'post__category'
+    )
+
+
+def run_job(job):
+    post = job.post
+    try:
+        if post.image.name == job.image:
+            build_variants(post.image)
+    except Exception as error:
+        # Ошибка одного изображения (Pillow, хранилище, нехватка памяти)
+        # не должна останавливать обработчик очереди.
+        fail_job(job, error)
+        return False
+    job.status = Status.DONE
+    job.last_error = ''
+    job.save(update_fields=('status', 'last_error'))
+    # Новый updated_at сбрасывает кэш карточки, теги — кэш страниц.
+    # Сохранение модели здесь не нужно: видимость публикации не меняется.
+    Post.objects.filter(pk=post.pk).update(updated_at=timezone.now())
+    tags = [feed_tag(), post_tag(post.pk), author_tag(post.author.username)]
+    if post.category_id is not None:
+        tags.append(category_tag(post.category.slug))
+    touch_tags(*tags)
+    return True
+
+
+def fail_job(job, error):
+    job.last_error = f'{type(error).__name__}: {error}'
+    if job.attempts >= settings.IMAGE_JOB_MAX_ATTEMPTS:
+        job.status = Status.FAILED
+        job.run_after = timezone.now() + timedelta(
+            seconds=settings.IMAGE_JOB_REQUEUE_INTERVAL
+        )
+    else:
+        job.status = Status.PENDING
+        job.run_after = timezone.now() + timedelta(
+            seconds=settings.IMAGE_JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+        )
+    job.save(update_fields=('status', 'run_after', 'last_error'))
+
+
+def process_jobs(limit=10):
+    done = failed = 0
+    for job in claim_jobs(limit):
+        if run_job(job):
+            done += 1
+        else:
+            failed += 1
+    return done, failed
+
+
+def queue_depth():
+    depth = dict.fromkeys(Status.values, 0)
+    depth.update(
+        ImageJob.objects.order_by().values_list('status').annotate(
+            count=Count('pk')
+        )
+    )
+    return depth
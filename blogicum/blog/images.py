@@ -0,0 +1,91 @@
+import hashlib
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from PIL import Image, ImageOps
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+
+VARIANT_WIDTHS = (320, 640, 960)
+VARIANT_FORMATS = (('webp', 'WEBP'), ('jpg', 'JPEG'))
+VARIANTS_DIR = 'posts_images/variants'
+VARIANT_QUALITY = 80
+
+
+def variant_name(name, width, extension):
+    """Имя копии; хэш полного имени различает cat.jpg и cat.png."""
+    stem = PurePosixPath(name).stem
+    digest = hashlib.md5(name.encode()).hexdigest()[:12]
+    return f'{VARIANTS_DIR}/{stem}_{digest}_{width}w.{extension}'
+
+
+def variant_width(storage, name):
+    """Настоящая ширина копии: маленькие изображения не увеличиваются.
+
+    Копия с таким именем не меняется, поэтому ширина кэшируется бессрочно.
+    """
+    def read_width():
+        with storage.open(name) as variant:
+            return Image.open(variant).width
+
+    return cache.get_or_set(f'image-width:{name}', read_width, None)
+
+
+def variant_names(name):
+    return [
+        (width, extension, variant_name(name, width, extension))
+        for width in VARIANT_WIDTHS
+        for extension, _ in VARIANT_FORMATS
+    ]
+
+
+def variants_ready(image):
+    """Варианты пишутся по порядку, поэтому хватает проверки последнего."""
+    *_, (_, _, last_name) = variant_names(image.name)
+    return image.storage.exists(last_name)
+
+
+def build_variants(image, force=False):
+    """Создаёт уменьшенные копии изображения; готовые не пересобирает."""
+    if not force and variants_ready(image):
+        return False
+    storage = image.storage
+    with storage.open(image.name) as source:
+        original = ImageOps.exif_transpose(Image.open(source))
+        original.load()
+    for width in VARIANT_WIDTHS:
+        resized = original.copy()
+        resized.thumbnail((width, width * 10), Image.Resampling.LANCZOS)
+        for extension, pil_format in VARIANT_FORMATS:
+            name = variant_name(image.name, width, extension)
+            if storage.exists(name):
+                if not force:
+                    continue
+                storage.delete(name)
+            frame = resized
+            if pil_format == 'JPEG' and frame.mode not in ('RGB', 'L'):
+                frame = frame.convert('RGB')
+            buffer = BytesIO()
+            frame.save(buffer, pil_format, quality=VARIANT_QUALITY)
+            storage.save(name, ContentFile(buffer.getvalue()))
+    return True
+
+
+def get_srcsets(image):
+    """Возвращает srcset для каждого формата или None, если копий нет."""
+    if not variants_ready(image):
+        return None
+    srcsets = {extension: {} for extension, _ in VARIANT_FORMATS}
+    for _, extension, name in variant_names(image.name):
+        width = variant_width(image.storage, name)
+        srcsets[extension].setdefault(
+            width, f'{image.storage.url(name)} {width}w'
+        )
+    result = {
+        extension: ', '.join(items.values())
+        for extension, items in srcsets.items()
+    }
+    result['src'] = image.storage.url(
+        variant_name(image.name, VARIANT_WIDTHS[-1], 'jpg')
+    )
+    return result
@@ -0,0 +1,106 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.test import AsyncClient, Client, override_settings
+
+from blog.models import Category, Post
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность страниц чтения через WSGI '
+        'и ASGI. Асинхронные представления подключаются переменной '
+        'BLOGICUM_ASYNC_VIEWS=1.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--mode', choices=('wsgi', 'asgi'), default='wsgi'
+        )
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument(
+            '--user',
+            help='Выполнять запросы от имени пользователя, минуя кэш '
+                 'страниц для анонимов.',
+        )
+
+    def get_paths(self):
+        post = Post.objects.first()
+        category = Category.objects.filter(is_published=True).first()
+        if post is None or category is None:
+            raise CommandError('В базе нет опубликованных постов.')
+        return [
+            '/',
+            '/?page=2',
+            f'/category/{category.slug}/',
+            f'/profile/{post.author.username}/',
+            f'/posts/{post.pk}/',
+        ]
+
+    def get_user(self, username):
+        if username is None:
+            return None
+        try:
+            return User.objects.get(username=username)
+        except User.DoesNotExist:
+            raise CommandError(f'Пользователь {username} не найден.')
+
+    def run_wsgi(self, paths, total, concurrency, user):
+        def fetch(number):
+            client = Client()
+            if user is not None:
+                client.force_login(user)
+            started = time.perf_counter()
+            response = client.get(paths[number % len(paths)])
+            close_old_connections()
+            return time.perf_counter() - started, response.status_code
+
+        with ThreadPoolExecutor(concurrency) as executor:
+            return list(executor.map(fetch, range(total)))
+
+    async def run_asgi(self, paths, total, concurrency, user):
+        client = AsyncClient()
+        if user is not None:
+            await asyncio.to_thread(client.force_login, user)
+        limit = asyncio.Semaphore(concurrency)
+
+        async def fetch(number):
+            async with limit:
+                started = time.perf_counter()
+                response = await client.get(paths[number % len(paths)])
+                return time.perf_counter() - started, response.status_code
+
+        return await asyncio.gather(*(fetch(i) for i in range(total)))
+
+    @override_settings(ALLOWED_HOSTS=['testserver'])
+    def handle(self, *args, **options):
+        paths = self.get_paths()
+        user = self.get_user(options['user'])
+        total, concurrency = options['requests'], options['concurrency']
+        started = time.perf_counter()
+        if options['mode'] == 'wsgi':
+            results = self.run_wsgi(paths, total, concurrency, user)
+        else:
+            results = asyncio.run(
+                self.run_asgi(paths, total, concurrency, user)
+            )
+        elapsed = time.perf_counter() - started
+        timings = sorted(timing for timing, _ in results)
+        errors = sum(status != 200 for _, status in results)
+        p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+        self.stdout.write(
+            f'{options["mode"]} (асинхронные представления: '
+            f'{"да" if settings.ASYNC_READ_VIEWS else "нет"}): '
+            f'{total / elapsed:.1f} запр/с, '
+            f'медиана {statistics.median(timings) * 1000:.1f} мс, '
+            f'p99 {p99 * 1000:.1f} мс, ошибок {errors}'
+        )
@@ -0,0 +1,173 @@
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+
+from blog.models import Comment, Post, User
+
+# Профили: PRAGMA для каждого соединения и начало транзакции записи.
+# Без настроек это журнал отката и отложенный BEGIN, как в Django.
+PROFILES = (
+    ('default', {'journal_mode': 'DELETE'}, 'BEGIN'),
+    ('production', settings.SQLITE_PRODUCTION_PRAGMAS, 'BEGIN IMMEDIATE'),
+)
+
+
+def apply_pragmas(dbapi_connection, pragmas):
+    for name, value in pragmas.items():
+        dbapi_connection.execute(f'PRAGMA {name} = {value}')
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает одновременное чтение ленты и запись комментариев в '
+        'SQLite без настроек и с SQLITE_PRODUCTION_PRAGMAS. Работает с '
+        'копией основной базы во временном каталоге.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=10.0,
+            help='Длительность прогона каждого профиля, сек.',
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[DEFAULT_DB_ALIAS]
+        if connection.vendor != 'sqlite':
+            raise CommandError('Основная база должна быть SQLite.')
+        post_ids = list(Post.objects.values_list('pk', flat=True)[:1000])
+        author_ids = list(User.objects.values_list('pk', flat=True)[:1000])
+        if not post_ids or not author_ids:
+            raise CommandError('В базе нет публикаций или пользователей.')
+        self.reads = self.get_read_queries(connection)
+        self.write = self.get_write_queries()
+        self.post_ids, self.author_ids = post_ids, author_ids
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'benchmark.sqlite3'
+            for name, pragmas, begin in PROFILES:
+                connection.ensure_connection()
+                target = sqlite3.connect(path)
+                connection.connection.backup(target)
+                apply_pragmas(target, pragmas)
+                target.close()
+                self.begin = begin
+                self.report(name, self.run(path, pragmas, options))
+
+    def get_read_queries(self, connection):
+        """SQL первой страницы ленты и её размера, как в PostListView."""
+        queryset = Post.default_filters.order_by('-pub_date')
+        queries = []
+        for query in (
+            queryset[:settings.POSTS_PER_PAGE].query,
+            queryset.values('pk')[:settings.POSTS_PER_PAGE * 10].query,
+        ):
+            sql, params = query.get_compiler(
+                connection=connection
+            ).as_sql()
+            queries.append((sql.replace('%s', '?'), params))
+        return queries
+
+    def get_write_queries(self):
+        """Запросы CommentCreateView.form_valid в одной транзакции."""
+        comment_table = Comment._meta.db_table
+        post_table = Post._meta.db_table
+        return (
+            f'SELECT id FROM {post_table} WHERE id = ?',
+            f'INSERT INTO {comment_table} '
+            '(post_id, author_id, text, created_at) VALUES (?, ?, ?, ?)',
+            f'UPDATE {post_table} SET comment_count = comment_count + 1 '
+            'WHERE id = ?',
+        )
+
+    def connect(self, path, pragmas):
+        dbapi_connection = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False
+        )
+        apply_pragmas(dbapi_connection, pragmas)
+        return dbapi_connection
+
+    def read(self, dbapi_connection, number):
+        for sql, params in self.reads:
+            dbapi_connection.execute(sql, params).fetchall()
+
+    def write_comment(self, dbapi_connection, number):
+        post_id = self.post_ids[number % len(self.post_ids)]
+        select, insert, update = self.write
+        dbapi_connection.execute(self.begin)
+        try:
+            dbapi_connection.execute(select, (post_id,)).fetchone()
+            dbapi_connection.execute(insert, (
+                post_id,
+                self.author_ids[number % len(self.author_ids)],
+                f'Комментарий для замера {number}',
+                timezone.now().isoformat(),
+            ))
+            dbapi_connection.execute(update, (post_id,))
+        except sqlite3.Error:
+            dbapi_connection.execute('ROLLBACK')
+            raise
+        dbapi_connection.execute('COMMIT')
+
+    def run(self, path, pragmas, options):
+        timings = defaultdict(list)
+        errors = defaultdict(int)
+        lock = threading.Lock()
+        deadline = time.monotonic() + options['duration']
+
+        def worker(kind, operation):
+            dbapi_connection = self.connect(path, pragmas)
+            number = 0
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    operation(dbapi_connection, number)
+                except sqlite3.OperationalError:
+                    with lock:
+                        errors[kind] += 1
+                else:
+                    with lock:
+                        timings[kind].append(
+                            (time.perf_counter() - started) * 1000
+                        )
+                number += 1
+            dbapi_connection.close()
+
+        threads = [
+            threading.Thread(target=worker, args=('read', self.read))
+            for _ in range(options['readers'])
+        ] + [
+            threading.Thread(
+                target=worker, args=('write', self.write_comment)
+            )
+            for _ in range(options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return timings, errors, options['duration']
+
+    def report(self, name, result):
+        timings, errors, duration = result
+        self.stdout.write(f'Профиль {name}:')
+        for kind in ('read', 'write'):
+            values = sorted(timings[kind])
+            p50 = statistics.median(values) if values else 0
+            p99 = values[int(len(values) * 0.99)] if values else 0
+            self.stdout.write(
+                f'  {kind}: {len(values) / duration:.1f} опер/с, '
+                f'p50 {p50:.2f} мс, p99 {p99:.2f} мс, '
+                f'ошибок «database is locked» {errors[kind]}'
+            )
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from blog.images import build_variants
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Создаёт уменьшенные копии изображений публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Пересоздать уже существующие копии.',
+        )
+
+    def handle(self, *args, **options):
+        built = failed = 0
+        images = Post.objects.exclude(image='').values_list(
+            'image', flat=True
+        )
+        field = Post._meta.get_field('image')
+        for name in images.iterator():
+            image = field.attr_class(None, field, name)
+            try:
+                built += build_variants(image, force=options['force'])
+            except Exception as error:
+                # Как и в очереди: ошибка одного изображения (в том числе
+                # DecompressionBombError) не останавливает обработку.
+                failed += 1
+                self.stderr.write(f'{name}: {type(error).__name__}: {error}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано изображений: {built}, ошибок: {failed}'
+        ))
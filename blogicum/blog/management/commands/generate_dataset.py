@@ -0,0 +1,170 @@
+import json
+import random
+from collections import Counter
+import sys
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from faker import Faker
+
+
+def fixture_date(value):
+    return value.isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт фикстуру в формате db.json с пользователями, категориями, '
+        'местами, публикациями и комментариями заданного объёма. '
+        'Загружается командой loaddata в пустую базу.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--locations', type=int, default=30)
+        parser.add_argument('--posts', type=int, default=2000)
+        parser.add_argument('--comments', type=int, default=10000)
+        parser.add_argument(
+            '--scheduled',
+            type=float,
+            default=0.05,
+            help='Доля отложенных публикаций.',
+        )
+        parser.add_argument(
+            '--unpublished',
+            type=float,
+            default=0.05,
+            help='Доля снятых с публикации категорий, мест и постов.',
+        )
+        parser.add_argument(
+            '--password',
+            default='loadtest-password',
+            help='Пароль всех созданных пользователей.',
+        )
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--output',
+            default='-',
+            help='Файл фикстуры; по умолчанию стандартный вывод.',
+        )
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.fake = Faker('ru_RU')
+        self.fake.seed_instance(options['seed'])
+        self.now = timezone.now()
+        self.options = options
+        output = (
+            sys.stdout if options['output'] == '-'
+            else open(options['output'], 'w', encoding='utf-8')
+        )
+        try:
+            self.write(output, self.objects())
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+    def write(self, output, objects):
+        output.write('[\n')
+        for number, obj in enumerate(objects):
+            if number:
+                output.write(',\n')
+            output.write(json.dumps(obj, ensure_ascii=False, indent=2))
+        output.write('\n]\n')
+
+    def published(self):
+        return self.random.random() >= self.options['unpublished']
+
+    def past_date(self, days=730):
+        return self.now - timedelta(seconds=self.random.randint(
+            60, days * 24 * 60 * 60
+        ))
+
+    def objects(self):
+        options = self.options
+        password = make_password(options['password'])
+        for pk in range(1, options['users'] + 1):
+            first_name = self.fake.first_name()
+            last_name = self.fake.last_name()
+            yield {'model': 'auth.user', 'pk': pk, 'fields': {
+                'password': password,
+                'last_login': None,
+                'is_superuser': False,
+                'username': f'user{pk}',
+                'first_name': first_name,
+                'last_name': last_name,
+                'email': f'user{pk}@example.com',
+                'is_staff': False,
+                'is_active': True,
+                'date_joined': fixture_date(self.past_date()),
+                'groups': [],
+                'user_permissions': [],
+            }}
+        categories = {}
+        for pk in range(1, options['categories'] + 1):
+            categories[pk] = self.published()
+            yield {'model': 'blog.category', 'pk': pk, 'fields': {
+                'created_at': fixture_date(self.past_date()),
+                'is_published': categories[pk],
+                'title': self.fake.sentence(nb_words=2).rstrip('.'),
+                'slug': f'category-{pk}',
+                'description': self.fake.paragraph(),
+            }}
+        for pk in range(1, options['locations'] + 1):
+            yield {'model': 'blog.location', 'pk': pk, 'fields': {
+                'created_at': fixture_date(self.past_date()),
+                'is_published': self.published(),
+                'name': self.fake.city(),
+            }}
+        comment_posts = [
+            self.random.randint(1, options['posts'])
+            for _ in range(options['comments'])
+        ]
+        yield from self.posts(categories, Counter(comment_posts))
+        yield from self.comments(comment_posts)
+
+    def posts(self, categories, comment_counts):
+        options = self.options
+        for pk in range(1, options['posts'] + 1):
+            if self.random.random() < options['scheduled']:
+                pub_date = self.now + timedelta(
+                    minutes=self.random.randint(1, 30 * 24 * 60)
+                )
+            else:
+                pub_date = self.past_date()
+            category = self.random.randint(1, options['categories'])
+            is_published = self.published()
+            yield {'model': 'blog.post', 'pk': pk, 'fields': {
+                'created_at': fixture_date(min(pub_date, self.now)),
+                'is_published': is_published,
+                'title': self.fake.sentence(nb_words=5).rstrip('.'),
+                'text': '\n\n'.join(self.fake.paragraphs(
+                    nb=self.random.randint(1, 5)
+                )),
+                'pub_date': fixture_date(pub_date),
+                'author': self.random.randint(1, options['users']),
+                'location': self.random.choice(
+                    (None, self.random.randint(1, options['locations']))
+                ),
+                'category': category,
+                'image': '',
+                'updated_at': fixture_date(min(pub_date, self.now)),
+                'comment_count': comment_counts[pk],
+                'is_visible': (
+                    is_published and categories[category]
+                    and pub_date < self.now
+                ),
+            }}
+
+    def comments(self, comment_posts):
+        options = self.options
+        for pk, post in enumerate(comment_posts, start=1):
+            yield {'model': 'blog.comment', 'pk': pk, 'fields': {
+                'post': post,
+                'author': self.random.randint(1, options['users']),
+                'text': self.fake.sentence(nb_words=12),
+                'created_at': fixture_date(self.past_date(days=365)),
+            }}
@@ -0,0 +1,289 @@
+import json
+import math
+import random
+import re
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode, urlsplit
+from urllib.request import (
+    HTTPCookieProcessor, HTTPRedirectHandler, build_opener,
+)
+
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from blog.models import Category, Post, User
+
+# Доли запросов чтения по адресам, в процентах.
+READ_MIX = (
+    ('index', 30),
+    ('post_detail', 30),
+    ('category_posts', 15),
+    ('profile', 10),
+    ('search', 5),
+    ('feed', 5),
+    ('index_page', 5),
+)
+# Адреса, которым для запроса нужны данные из базы.
+MIX_TARGETS = {
+    'post_detail': 'post_ids',
+    'category_posts': 'slugs',
+    'profile': 'usernames',
+}
+SAMPLE_SIZE = 500
+CSRF_INPUT = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+def percentile(values, share):
+    """Процентиль по ближайшему рангу для отсортированного списка."""
+    if not values:
+        return None
+    return values[max(0, math.ceil(share / 100 * len(values)) - 1)]
+
+
+class NoRedirect(HTTPRedirectHandler):
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Session:
+    """Клиент одного виртуального пользователя со своими cookie."""
+
+    def __init__(self, base_url, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.cookies = CookieJar()
+        self.opener = build_opener(
+            HTTPCookieProcessor(self.cookies), NoRedirect()
+        )
+
+    def request(self, path, data=None):
+        body = urlencode(data).encode() if data is not None else None
+        try:
+            with self.opener.open(
+                self.base_url + path, body, timeout=self.timeout
+            ) as response:
+                return response.status, response.read().decode()
+        except HTTPError as error:
+            return error.code, ''
+
+    def csrf_token(self, form_path):
+        """Токен CSRF из формы на странице form_path."""
+        _, content = self.request(form_path)
+        token = CSRF_INPUT.search(content)
+        return token.group(1) if token else None
+
+    def login(self, username, password):
+        token = self.csrf_token(reverse('login'))
+        status, _ = self.request(reverse('login'), {
+            'username': username,
+            'password': password,
+            'csrfmiddlewaretoken': token,
+        })
+        return token is not None and status == 302
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагружает запущенный сайт смесью чтения и комментирования и '
+        'сохраняет пропускную способность и p50/p95/p99 по адресам в JSON.'
+    )
+    session_class = Session
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument(
+            '--duration',
+            type=float,
+            help='Ограничить прогон временем, сек.',
+        )
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument(
+            '--write-share',
+            type=float,
+            default=0.05,
+            help='Доля запросов, добавляющих комментарий.',
+        )
+        parser.add_argument(
+            '--password',
+            default='loadtest-password',
+            help='Пароль пользователей из generate_dataset.',
+        )
+        parser.add_argument('--timeout', type=float, default=30.0)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', help='Файл для отчёта в JSON.')
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.targets = self.get_targets()
+        self.read_mix = [
+            (name, weight) for name, weight in READ_MIX
+            if self.targets.get(MIX_TARGETS.get(name), True)
+        ]
+        self.lock = threading.Lock()
+        self.issued = 0
+        self.deadline = (
+            time.monotonic() + options['duration']
+            if options['duration'] else None
+        )
+        self.timings = defaultdict(list)
+        self.errors = defaultdict(int)
+        started = time.monotonic()
+        with ThreadPoolExecutor(options['concurrency']) as executor:
+            for future in [
+                executor.submit(self.worker, number)
+                for number in range(options['concurrency'])
+            ]:
+                future.result()
+        elapsed = time.monotonic() - started
+        report = self.build_report(elapsed)
+        for name, route in report['routes'].items():
+            self.stdout.write(
+                f'{name}: {route["requests"]} запр., '
+                f'ошибок {route["errors"]}, p50 {route["p50_ms"]} мс, '
+                f'p95 {route["p95_ms"]} мс, p99 {route["p99_ms"]} мс'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Всего {report["requests"]} запросов за {elapsed:.1f} с, '
+            f'{report["throughput_rps"]} запр/с'
+        ))
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, ensure_ascii=False, indent=2)
+
+    def get_targets(self):
+        post_ids = list(Post.objects.default_filters().order_by(
+            '-pub_date'
+        ).values_list('pk', flat=True)[:SAMPLE_SIZE])
+        if not post_ids:
+            raise CommandError(
+                'В базе нет опубликованных постов; загрузите фикстуру '
+                'generate_dataset.'
+            )
+        return {
+            'post_ids': post_ids,
+            'slugs': list(Category.objects.filter(
+                is_published=True
+            ).values_list('slug', flat=True)),
+            'usernames': list(User.objects.filter(
+                post__is_visible=True
+            ).values_list('username', flat=True).distinct()[:SAMPLE_SIZE]),
+            'words': [
+                word for title in Post.objects.default_filters().values_list(
+                    'title', flat=True
+                )[:SAMPLE_SIZE] for word in title.split() if len(word) > 4
+            ] or ['публикация'],
+        }
+
+    def take_slot(self):
+        with self.lock:
+            if self.deadline is not None:
+                return time.monotonic() < self.deadline
+            if self.issued >= self.options['requests']:
+                return False
+            self.issued += 1
+            return True
+
+    def read_path(self, rng):
+        targets = self.targets
+        builders = {
+            'index': lambda: reverse('blog:index'),
+            'index_page': lambda: (
+                f'{reverse("blog:index")}?page={rng.randint(2, 5)}'
+            ),
+            'post_detail': lambda: reverse(
+                'blog:post_detail', args=(rng.choice(targets['post_ids']),)
+            ),
+            'category_posts': lambda: reverse(
+                'blog:category_posts', args=(rng.choice(targets['slugs']),)
+            ),
+            'profile': lambda: reverse(
+                'blog:profile', args=(rng.choice(targets['usernames']),)
+            ),
+            'search': lambda: f'{reverse("blog:search")}?' + urlencode(
+                {'q': rng.choice(targets['words'])}
+            ),
+            'feed': lambda: reverse('blog:feed'),
+        }
+        names, weights = zip(*self.read_mix)
+        return builders[rng.choices(names, weights=weights)[0]]()
+
+    def worker(self, number):
+        rng = random.Random(self.options['seed'] * 1000 + number)
+        session = self.session_class(
+            self.options['base_url'], self.options['timeout']
+        )
+        usernames = self.targets['usernames']
+        writer = bool(usernames) and session.login(
+            rng.choice(usernames), self.options['password']
+        )
+        while self.take_slot():
+            data = None
+            if writer and rng.random() < self.options['write_share']:
+                post_id = rng.choice(self.targets['post_ids'])
+                path = reverse('blog:add_comment', args=(post_id,))
+                data = {
+                    'text': f'Нагрузочный комментарий {timezone.now()}',
+                    'csrfmiddlewaretoken': session.csrf_token(
+                        reverse('blog:post_detail', args=(post_id,))
+                    ),
+                }
+            else:
+                path = self.read_path(rng)
+            started = time.perf_counter()
+            try:
+                status, _ = session.request(path, data)
+            except URLError:
+                status = None
+            self.record(path, status, time.perf_counter() - started)
+
+    def record(self, path, status, elapsed):
+        view_name = resolve(urlsplit(path).path).view_name
+        with self.lock:
+            self.timings[view_name].append(elapsed * 1000)
+            if status is None or status >= 400:
+                self.errors[view_name] += 1
+
+    def build_report(self, elapsed):
+        routes = {}
+        for name, timings in sorted(self.timings.items()):
+            timings.sort()
+            routes[name] = {
+                'requests': len(timings),
+                'errors': self.errors[name],
+                'mean_ms': round(sum(timings) / len(timings), 2),
+                **{
+                    f'p{share}_ms': round(percentile(timings, share), 2)
+                    for share in (50, 95, 99)
+                },
+            }
+        total = sum(route['requests'] for route in routes.values())
+        return {
+            'commit': git_commit(),
+            'finished_at': timezone.now().isoformat(),
+            'base_url': self.options['base_url'],
+            'concurrency': self.options['concurrency'],
+            'write_share': self.options['write_share'],
+            'duration_s': round(elapsed, 2),
+            'requests': total,
+            'throughput_rps': round(total / elapsed, 2) if elapsed else None,
+            'routes': routes,
+        }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ('git', 'rev-parse', 'HEAD'),
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.image_queue import process_jobs, queue_depth
+
+
+class Command(BaseCommand):
+    help = 'Обрабатывает очередь изображений публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Разобрать готовые задачи и завершиться.',
+        )
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            help='Показать глубину очереди и завершиться.',
+        )
+        parser.add_argument('--batch', type=int, default=10)
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=2.0,
+            help='Пауза между опросами пустой очереди, сек.',
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            for status, count in queue_depth().items():
+                self.stdout.write(f'{status}: {count}')
+            return
+        while True:
+            done, failed = process_jobs(options['batch'])
+            if done or failed:
+                self.stdout.write(f'Готово: {done}, с ошибкой: {failed}')
+            elif options['once']:
+                break
+            else:
+                time.sleep(options['sleep'])
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.publishing import next_publication, publish_due_posts
+
+
+class Command(BaseCommand):
+    help = 'Открывает читателям отложенные публикации, время которых пришло.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Открыть наступившие публикации и завершиться.',
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Сверить видимость всех публикаций, а не только отложенных.',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=60.0,
+            help='Наибольшая пауза между проверками, сек.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            changed = publish_due_posts(full=options['full'])
+            if changed:
+                self.stdout.write(f'Изменена видимость публикаций: {changed}')
+            if options['once']:
+                break
+            pause = options['sleep']
+            next_pub_date = next_publication()
+            if next_pub_date is not None:
+                seconds = (next_pub_date - timezone.now()).total_seconds()
+                pause = max(0.0, min(pause, seconds))
+            time.sleep(pause)
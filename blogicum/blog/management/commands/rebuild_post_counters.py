@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики публикаций категорий и авторов.'
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        updated = rebuild_counters()
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено счётчиков: {updated}')
+        )
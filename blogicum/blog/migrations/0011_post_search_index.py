@@ -0,0 +1,59 @@
+from django.db import migrations
+
+# SQL повторяет blog/search.py на момент миграции: код приложения может
+# меняться, а миграция должна создавать тот же индекс.
+FTS_TABLE = 'blog_post_fts'
+CREATE_TABLE = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+    "title, text, content='blog_post', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')"
+)
+TRIGGERS = {
+    f'{FTS_TABLE}_insert': (
+        'AFTER INSERT ON blog_post BEGIN '
+        f'INSERT INTO {FTS_TABLE}(rowid, title, text) '
+        'VALUES (new.id, new.title, new.text); END'
+    ),
+    f'{FTS_TABLE}_delete': (
+        'AFTER DELETE ON blog_post BEGIN '
+        f'INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text) '
+        "VALUES ('delete', old.id, old.title, old.text); END"
+    ),
+    f'{FTS_TABLE}_update': (
+        'AFTER UPDATE OF title, text ON blog_post BEGIN '
+        f'INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text) '
+        "VALUES ('delete', old.id, old.title, old.text); "
+        f'INSERT INTO {FTS_TABLE}(rowid, title, text) '
+        'VALUES (new.id, new.title, new.text); END'
+    ),
+}
+
+
+def install(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_TABLE)
+    for name, body in TRIGGERS.items():
+        schema_editor.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {body}')
+    schema_editor.execute(
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+    )
+
+
+def drop(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for name in TRIGGERS:
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {name}')
+    schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_post_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, drop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 3.2.16 on 2026-10-18 17:46
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blog', '0012_imagejob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Видимых публикаций')),
+                ('refresh_after', models.DateTimeField(blank=True, help_text='Ближайшая отложенная публикация или время изменения.', null=True, verbose_name='Пересчитать после')),
+                ('author', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='post_counter', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('category', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='post_counter', to='blog.category', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'счётчик публикаций',
+                'verbose_name_plural': 'Счётчики публикаций',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='postcounter',
+            constraint=models.CheckConstraint(check=models.Q(models.Q(('author__isnull', True), ('category__isnull', False)), models.Q(('author__isnull', False), ('category__isnull', True)), _connector='OR'), name='postcounter_single_owner'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations
+
+# Выражение индекса повторяет SEARCH_VECTOR из blog/search.py: запрос
+# поиска использует индекс, только если выражения совпадают дословно.
+CREATE_INDEX = (
+    'CREATE INDEX IF NOT EXISTS blog_post_search_gin_idx ON blog_post '
+    "USING gin (to_tsvector('russian', title || ' ' || text))"
+)
+DROP_INDEX = 'DROP INDEX IF EXISTS blog_post_search_gin_idx'
+
+
+def install(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_INDEX)
+
+
+def drop(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_post_is_visible'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, drop),
+    ]
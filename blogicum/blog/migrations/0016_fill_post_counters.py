@@ -0,0 +1,30 @@
+# Generated by Django 3.2.16 on 2026-10-18 19:20
+
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count, Q
+
+
+def fill_post_counters(apps, schema_editor):
+    Category = apps.get_model('blog', 'Category')
+    PostCounter = apps.get_model('blog', 'PostCounter')
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    visible = Count('post', filter=Q(post__is_visible=True))
+    for field, model in (('category', Category), ('author', User)):
+        for owner in model.objects.annotate(visible=visible):
+            PostCounter.objects.update_or_create(
+                **{field: owner},
+                defaults={'count': owner.visible, 'refresh_after': None},
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blog', '0015_post_search_gin_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_post_counters, migrations.RunPython.noop),
+    ]
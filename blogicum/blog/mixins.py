@@ -1,10 +1,22 @@
+import hashlib
+
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.cache import cache
 from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
+from django.middleware.csrf import get_token
 from django.shortcuts import redirect, get_object_or_404
 from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from core.routers import reading_replica
 
+from .cache import SHARED_TAGS, get_tag_versions, page_cache_key
 from .models import Post, Comment
+from .paginators import (
+    CachedCountPaginator, CounterPaginator, KeysetPaginator,
+)
 
 
 class GetSuccessUrlPostDetailMixin:
@@ -44,9 +56,21 @@ class PostMixin(LoginRequiredMixin):
 
 
 class PaginationMixin:
+    cursor_pagination = False
+
+    def get_count_scope(self):
+        return None
+
+    def get_post_counter(self):
+        """Пара ('category', slug) или ('author', username) для счётчика."""
+        return None
 
     def paginate_queryset(self, queryset, page_size=settings.POSTS_PER_PAGE):
-        paginator = Paginator(queryset, page_size)
+        if self.cursor_pagination:
+            return KeysetPaginator(queryset, page_size).page(
+                self.request.GET.get('cursor')
+            )
+        paginator = self.get_paginator(queryset, page_size)
         page = self.request.GET.get('page')
         try:
             posts = paginator.page(page)
@@ -54,4 +78,115 @@ class PaginationMixin:
             posts = paginator.page(1)
         except EmptyPage:
             posts = paginator.page(paginator.num_pages)
+        posts.elided_page_range = paginator.get_elided_page_range(
+            posts.number
+        )
         return posts
+
+    def get_paginator(self, queryset, page_size):
+        counter = self.get_post_counter()
+        if counter is not None:
+            return CounterPaginator(queryset, page_size, counter)
+        count_scope = self.get_count_scope()
+        if count_scope is None:
+            return Paginator(queryset, page_size)
+        return CachedCountPaginator(queryset, page_size, count_scope)
+
+
+class CacheTagsMixin:
+    """Общая основа для кэша страниц и валидаторов условных запросов.
+
+    Представление перечисляет теги своей страницы в get_cache_tags().
+    """
+
+    def get_tag_versions(self):
+        if not hasattr(self, '_tag_versions'):
+            self._tag_versions = get_tag_versions(
+                (*self.get_cache_tags(), *SHARED_TAGS)
+            )
+        return self._tag_versions
+
+
+class ConditionalGetMixin(CacheTagsMixin):
+    """Отвечает 304 по ETag и Last-Modified, не строя страницу.
+
+    Валидаторы берутся из версий тегов кэша и даты последней видимой
+    публикации, поэтому наступление отложенной публикации тоже меняет их.
+    """
+
+    def get_latest_pub_date(self):
+        return None
+
+    def get_validators(self):
+        versions = self.get_tag_versions()
+        latest_pub_date = self.get_latest_pub_date()
+        parts = [
+            self.request.get_full_path(),
+            str(self.request.user.pk),
+            str(latest_pub_date),
+            *(f'{t}={v}' for t, v in sorted(versions.items())),
+        ]
+        if self.request.user.is_authenticated:
+            # Формы страницы содержат CSRF-токен, который меняется при
+            # новом входе; иначе браузер оставит форму со старым токеном.
+            get_token(self.request)
+            parts.append(self.request.META['CSRF_COOKIE'])
+        etag = f'W/"{hashlib.md5(":".join(parts).encode()).hexdigest()}"'
+        if self.request.user.is_authenticated:
+            return etag, None
+        timestamps = list(versions.values())
+        if latest_pub_date is not None:
+            timestamps.append(latest_pub_date.timestamp())
+        return etag, int(max(timestamps))
+
+    def dispatch(self, request, *args, **kwargs):
+        # Страница с отстающей реплики не получает валидаторов: иначе
+        # клиент получал бы 304 и после того, как реплика догонит данные.
+        if request.method not in ('GET', 'HEAD') or reading_replica():
+            return super().dispatch(request, *args, **kwargs)
+        etag, last_modified = self.get_validators()
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is not None:
+            return response
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class AnonymousPageCacheMixin(CacheTagsMixin):
+    """Кэширует страницу целиком для анонимных читателей.
+
+    Ключ строится из адреса страницы и версий её тегов, поэтому
+    изменение связанных данных сразу делает старую запись недоступной.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or (
+            request.user.is_authenticated
+        ):
+            return super().dispatch(request, *args, **kwargs)
+        key = page_cache_key(
+            request.get_full_path(), self.get_tag_versions()
+        )
+        response = cache.get(key)
+        if response is not None:
+            return response
+        response = super().dispatch(request, *args, **kwargs)
+        if (
+            response.status_code == 200 and request.method == 'GET'
+            and not reading_replica()
+        ):
+            def store(response):
+                if not request.META.get('CSRF_COOKIE_USED'):
+                    cache.set(key, response, settings.PAGE_CACHE_TIMEOUT)
+
+            if hasattr(response, 'render') and not response.is_rendered:
+                response.add_post_render_callback(store)
+            else:
+                store(response)
+        return response
@@ -1,8 +1,14 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import connections, models
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 from core.models import PublishedModel, CreatedAtModel
+from .search import (
+    FTS_TABLE, SEARCH_CONFIG, SEARCH_VECTOR, build_match_query, build_tsquery,
+)
 
 
 User = get_user_model()
@@ -11,22 +17,90 @@ User = get_user_model()
 class PostQuerySet(models.QuerySet):
 
     def with_related_data(self):
-        return self.select_related('category', 'author')
+        return self.select_related('category', 'author', 'location')
 
-    def default_filters(self):
+    def scheduled(self):
         return self.filter(
+            is_published=True,
+            is_visible=False,
+            pub_date__gte=timezone.now(),
+        ).order_by('pub_date')
+
+    def refresh_visibility(self):
+        """Приводит флаг is_visible к условиям показа публикаций.
+
+        Возвращает изменённые публикации как кортежи
+        (pk, category__slug, author__username, is_visible) с новым
+        значением флага.
+        """
+        visible = Q(
             is_published=True,
             category__is_published=True,
             pub_date__lt=timezone.now(),
         )
+        shown = self.filter(visible, is_visible=False)
+        hidden = self.filter(~visible, is_visible=True)
+        fields = ('pk', 'category__slug', 'author__username')
+        changed = [
+            *(row + (True,) for row in shown.values_list(*fields)),
+            *(row + (False,) for row in hidden.values_list(*fields)),
+        ]
+        if changed:
+            shown.update(is_visible=True)
+            hidden.update(is_visible=False)
+        return changed
 
+    def rebuild_comment_count(self):
+        comment_count = Comment.objects.filter(
+            post=OuterRef('pk')
+        ).order_by().values('post').annotate(
+            count=Count('pk')
+        ).values('count')
+        return self.update(
+            comment_count=Coalesce(Subquery(comment_count), 0)
+        )
+
+    def search(self, query):
+        match = build_match_query(query)
+        if not match:
+            return self.none()
+        vendor = connections[self.db].vendor
+        if vendor == 'postgresql':
+            from django.contrib.postgres.search import (
+                SearchQuery, SearchRank, SearchVectorField,
+            )
+
+            vector = RawSQL(
+                SEARCH_VECTOR.format(table='blog_post.'), [],
+                output_field=SearchVectorField(),
+            )
+            tsquery = SearchQuery(
+                build_tsquery(query), config=SEARCH_CONFIG, search_type='raw'
+            )
+            return self.alias(search_vector=vector).filter(
+                search_vector=tsquery
+            ).annotate(
+                search_rank=SearchRank(vector, tsquery)
+            ).order_by('-search_rank')
+        if vendor != 'sqlite':
+            return self.filter(
+                Q(title__icontains=query) | Q(text__icontains=query)
+            )
+        matches = f'SELECT {{}} FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+        return self.alias(search_rank=RawSQL(
+            matches.format('rank') + ' AND rowid = blog_post.id', [match]
+        )).filter(
+            pk__in=RawSQL(matches.format('rowid'), [match])
+        ).order_by('search_rank')
+
+    def default_filters(self):
+        return self.filter(is_visible=True)
 
-class DefaultPostManager(models.Manager):
+
+class DefaultPostManager(models.Manager.from_queryset(PostQuerySet)):
 
     def get_queryset(self):
-        return (
-            PostQuerySet(self.model).with_related_data().default_filters()
-        )
+        return super().get_queryset().with_related_data().default_filters()
 
 
 class Category(PublishedModel, CreatedAtModel):
@@ -93,21 +167,71 @@ class Post(PublishedModel, CreatedAtModel):
         blank=True,
         verbose_name='Изображение',
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено',
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев',
+    )
+    is_visible = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Видна читателям',
+        help_text=(
+            'Отложенные публикации открывает команда publish_scheduled.'
+        ),
+    )
 
     objects = PostQuerySet.as_manager()
     default_filters = DefaultPostManager()
 
     @property
-    def comment_count(self):
-        return self.comment.count()
+    def is_public(self):
+        return (
+            self.is_published
+            and self.category is not None
+            and self.category.is_published
+            and self.pub_date < timezone.now()
+        )
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
+        indexes = (
+            models.Index(
+                fields=('-pub_date',),
+                condition=Q(is_visible=True),
+                name='post_visible_feed_idx',
+            ),
+            models.Index(
+                fields=('pub_date',),
+                condition=Q(is_published=True, is_visible=False),
+                name='post_scheduled_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='post_author_pub_date_idx',
+            ),
+            models.Index(
+                fields=('category', '-pub_date'),
+                name='post_category_pub_date_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, update_fields=None, **kwargs):
+        self.is_visible = self.is_public
+        if update_fields is not None:
+            # Сигналы сдвигают счётчики по is_visible в памяти, поэтому
+            # флаг записывается вместе с любыми полями.
+            update_fields = {*update_fields, 'is_visible'}
+        super().save(*args, update_fields=update_fields, **kwargs)
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
@@ -134,6 +258,114 @@ class Comment(models.Model):
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_at_idx',
+            ),
+        )
 
     def __str__(self):
         return f'Комментарий пользователя {self.author}'
+
+
+class ImageJob(models.Model):
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'В очереди'
+        RUNNING = 'running', 'Выполняется'
+        DONE = 'done', 'Готово'
+        FAILED = 'failed', 'Ошибка'
+
+    post = models.ForeignKey(
+        Post,
+        related_name='image_jobs',
+        on_delete=models.CASCADE,
+        verbose_name='Публикация',
+    )
+    image = models.CharField(max_length=100, verbose_name='Изображение')
+    status = models.CharField(
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name='Статус',
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток',
+    )
+    run_after = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Выполнить после',
+    )
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Добавлено',
+    )
+
+    class Meta:
+        verbose_name = 'обработка изображения'
+        verbose_name_plural = 'Очередь обработки изображений'
+        ordering = ('run_after',)
+        indexes = (
+            models.Index(
+                fields=('status', 'run_after'),
+                name='imagejob_status_run_after_idx',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.image} ({self.get_status_display()})'
+
+
+class PostCounter(models.Model):
+    category = models.OneToOneField(
+        Category,
+        null=True,
+        blank=True,
+        related_name='post_counter',
+        on_delete=models.CASCADE,
+        verbose_name='Категория',
+    )
+    author = models.OneToOneField(
+        User,
+        null=True,
+        blank=True,
+        related_name='post_counter',
+        on_delete=models.CASCADE,
+        verbose_name='Автор',
+    )
+    count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Видимых публикаций',
+    )
+    refresh_after = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Пересчитать после',
+        help_text='Время изменения, после которого нужен пересчёт.',
+    )
+
+    class Meta:
+        verbose_name = 'счётчик публикаций'
+        verbose_name_plural = 'Счётчики публикаций'
+        constraints = (
+            models.CheckConstraint(
+                check=(
+                    Q(category__isnull=False, author__isnull=True)
+                    | Q(category__isnull=True, author__isnull=False)
+                ),
+                name='postcounter_single_owner',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.category or self.author}: {self.count}'
+
+    @property
+    def is_stale(self):
+        return (
+            self.refresh_after is not None
+            and self.refresh_after <= timezone.now()
+        )
@@ -0,0 +1,141 @@
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from . import counters
+from .cache import get_post_count
+
+NEXT = 'next'
+PREVIOUS = 'prev'
+# Наибольший первичный ключ (BigAutoField); больший id в курсоре отбрасывается.
+MAX_PK = 2 ** 63 - 1
+
+
+class CachedCountPaginator(Paginator):
+    """Хранит общее количество объектов в кэше, считая его при промахе."""
+
+    def __init__(self, object_list, per_page, count_scope, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_scope = count_scope
+
+    @cached_property
+    def count(self):
+        return get_post_count(
+            self.count_scope, lambda: super(CachedCountPaginator, self).count
+        )
+
+
+class CounterPaginator(Paginator):
+    """Берёт общее количество из счётчика публикаций категории или автора."""
+
+    def __init__(self, object_list, per_page, counter, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.counter = counter
+
+    @cached_property
+    def count(self):
+        return counters.get_post_count(*self.counter)
+
+
+class KeysetPage(Sequence):
+    """Страница курсорной пагинации: без номеров и общего количества."""
+
+    is_keyset = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Пагинация поиском по паре (key, id) вместо COUNT(*) и OFFSET."""
+
+    def __init__(self, queryset, per_page, key='pub_date', descending=True):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.key = key
+        self.descending = descending
+
+    def encode_cursor(self, direction, obj):
+        value = getattr(obj, self.key).isoformat()
+        raw = json.dumps([direction, value, obj.pk]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            direction, value, pk = json.loads(raw)
+            value = parse_datetime(value)
+            pk = int(pk)
+        except (binascii.Error, TypeError, ValueError):
+            return None
+        if (
+            direction not in (NEXT, PREVIOUS) or value is None
+            or not 0 < pk <= MAX_PK
+        ):
+            return None
+        return direction, value, pk
+
+    def _seek(self, direction, value, pk):
+        forward = direction == NEXT
+        lookup = 'lt' if forward == self.descending else 'gt'
+        return self.queryset.filter(
+            Q(**{f'{self.key}__{lookup}': value})
+            | Q(**{self.key: value, f'pk__{lookup}': pk})
+        )
+
+    def _ordered(self, queryset, reverse=False):
+        prefix = '-' if self.descending != reverse else ''
+        return queryset.order_by(f'{prefix}{self.key}', f'{prefix}pk')
+
+    def page(self, cursor=None):
+        position = self.decode_cursor(cursor) if cursor else None
+        if position is None:
+            direction, queryset = NEXT, self._ordered(self.queryset)
+        else:
+            direction = position[0]
+            queryset = self._ordered(
+                self._seek(*position), reverse=direction == PREVIOUS
+            )
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == PREVIOUS:
+            rows.reverse()
+        if not rows:
+            return KeysetPage(rows)
+        if direction == NEXT:
+            has_next, has_previous = has_more, position is not None
+        else:
+            has_next, has_previous = True, has_more
+        return KeysetPage(
+            rows,
+            next_cursor=(
+                self.encode_cursor(NEXT, rows[-1]) if has_next else None
+            ),
+            previous_cursor=(
+                self.encode_cursor(PREVIOUS, rows[0]) if has_previous else None
+            ),
+        )
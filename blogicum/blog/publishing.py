@@ -0,0 +1,44 @@
+"""Открытие отложенных публикаций.
+
+Видимость публикации хранится во флаге is_visible, поэтому запросы
+читателей не сравнивают даты с текущим временем и одинаковы от запроса
+к запросу. Флаг пересчитывается при сохранении публикации и категории,
+а наступившие отложенные публикации открывает publish_due_posts().
+"""
+from .cache import (
+    author_tag, category_tag, feed_scope, feed_tag, invalidate_post_counts,
+    post_tag, touch_tags,
+)
+from .counters import shift_counters
+from .models import Post
+
+
+def invalidate_visibility(changed):
+    """Сбрасывает кэши для публикаций из PostQuerySet.refresh_visibility()."""
+    categories = {category for _, category, _, _ in changed if category}
+    authors = {author for _, _, author, _ in changed}
+    invalidate_post_counts(feed_scope())
+    shift_counters(
+        (category, author, 1 if is_visible else -1)
+        for _, category, author, is_visible in changed
+    )
+    touch_tags(
+        feed_tag(),
+        *(post_tag(pk) for pk, _, _, _ in changed),
+        *(category_tag(category) for category in categories),
+        *(author_tag(author) for author in authors),
+    )
+
+
+def publish_due_posts(full=False):
+    posts = Post.objects.all()
+    if not full:
+        posts = posts.filter(is_published=True, is_visible=False)
+    changed = posts.refresh_visibility()
+    if changed:
+        invalidate_visibility(changed)
+    return len(changed)
+
+
+def next_publication():
+    return Post.objects.scheduled().values_list('pub_date', flat=True).first()
@@ -0,0 +1,84 @@
+import re
+
+from django.db import connections
+
+FTS_TABLE = 'blog_post_fts'
+MAX_TERMS = 10
+# PostgreSQL: GIN-индекс blog_post_search_gin_idx из миграции 0015 построен
+# по этому выражению; запрос должен повторять его дословно.
+SEARCH_CONFIG = 'russian'
+SEARCH_VECTOR = (
+    f"to_tsvector('{SEARCH_CONFIG}', {{table}}title || ' ' || {{table}}text)"
+)
+
+CREATE_TABLE = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+    "title, text, content='blog_post', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')"
+)
+TRIGGERS = {
+    f'{FTS_TABLE}_insert': (
+        'AFTER INSERT ON blog_post BEGIN '
+        f'INSERT INTO {FTS_TABLE}(rowid, title, text) '
+        'VALUES (new.id, new.title, new.text); END'
+    ),
+    f'{FTS_TABLE}_delete': (
+        'AFTER DELETE ON blog_post BEGIN '
+        f'INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text) '
+        "VALUES ('delete', old.id, old.title, old.text); END"
+    ),
+    f'{FTS_TABLE}_update': (
+        'AFTER UPDATE OF title, text ON blog_post BEGIN '
+        f'INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text) '
+        "VALUES ('delete', old.id, old.title, old.text); "
+        f'INSERT INTO {FTS_TABLE}(rowid, title, text) '
+        'VALUES (new.id, new.title, new.text); END'
+    ),
+}
+
+
+def supports_fts(using='default'):
+    return connections[using].vendor == 'sqlite'
+
+
+def install_search_index(using='default', create=True):
+    """Создаёт FTS5-индекс и триггеры, если их ещё нет.
+
+    SQLite удаляет триггеры, когда миграция пересоздаёт таблицу
+    blog_post, поэтому после каждого migrate триггеры восстанавливаются
+    (create=False — только для уже созданного индекса).
+    """
+    if not supports_fts(using):
+        return
+    with connections[using].cursor() as cursor:
+        names = (FTS_TABLE, *TRIGGERS)
+        cursor.execute(
+            'SELECT name FROM sqlite_master WHERE name IN ({})'.format(
+                ', '.join(['%s'] * len(names))
+            ),
+            names,
+        )
+        existing = {name for name, in cursor.fetchall()}
+        if not create and FTS_TABLE not in existing:
+            return
+        cursor.execute(CREATE_TABLE)
+        for name, body in TRIGGERS.items():
+            cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {body}')
+        if not existing.issuperset(names):
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+            )
+
+
+def search_terms(query):
+    return re.findall(r'\w+', query)[:MAX_TERMS]
+
+
+def build_match_query(query):
+    """Превращает ввод читателя в безопасное выражение MATCH."""
+    return ' '.join(f'"{term}"*' for term in search_terms(query))
+
+
+def build_tsquery(query):
+    """То же для to_tsquery в PostgreSQL: все слова по префиксу."""
+    return ' & '.join(f'{term}:*' for term in search_terms(query))
@@ -0,0 +1,172 @@
+from django.db.models import F, Q
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save,
+)
+from django.dispatch import receiver
+
+from .cache import (
+    author_scope, author_tag, category_tag, feed_scope, feed_tag,
+    invalidate_post_counts, post_tag, touch_tags,
+)
+from .counters import expire_counters, shift_counters
+from .image_queue import enqueue_image_job
+from .models import Category, Comment, Location, Post, PostCounter, User
+
+
+def get_post_state(post):
+    category = Category.objects.filter(
+        pk=post.category_id
+    ).values_list('slug', flat=True).first()
+    author = User.objects.filter(
+        pk=post.author_id
+    ).values_list('username', flat=True).first()
+    return category, author
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_state(sender, instance, raw=False, **kwargs):
+    instance._previous_state = None
+    if instance.pk is not None and not raw:
+        instance._previous_state = Post.objects.filter(
+            pk=instance.pk
+        ).values_list(
+            'category__slug', 'author__username', 'is_visible'
+        ).first()
+
+
+def count_post_changes(instance, signal, previous):
+    """Изменения видимости публикации для shift_counters()."""
+    category, author = get_post_state(instance)
+    changes = []
+    if signal is post_save and previous is not None and previous[2]:
+        changes.append((previous[0], previous[1], -1))
+    if instance.is_visible:
+        changes.append((category, author, -1 if signal is post_delete else 1))
+    return changes
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_caches(sender, instance, signal, raw=False, **kwargs):
+    previous = getattr(instance, '_previous_state', None)
+    states = {get_post_state(instance)}
+    if previous is not None:
+        states.add(previous[:2])
+    scopes, tags = [feed_scope()], [feed_tag(), post_tag(instance.pk)]
+    categories, authors = [], []
+    for category, author in filter(None, states):
+        if category:
+            categories.append(category)
+            tags.append(category_tag(category))
+        if author:
+            authors.append(author)
+            scopes.append(author_scope(author, own=True))
+            tags.append(author_tag(author))
+    invalidate_post_counts(*scopes)
+    if raw:
+        # При loaddata прежнее состояние строки неизвестно.
+        expire_counters(categories, authors)
+    else:
+        shift_counters(count_post_changes(instance, signal, previous))
+    touch_tags(*tags)
+
+
+@receiver(post_save, sender=Post)
+def queue_image_variants(sender, instance, raw=False, **kwargs):
+    if not raw:
+        enqueue_image_job(instance)
+
+
+@receiver(pre_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def remember_category_state(sender, instance, raw=False, **kwargs):
+    instance._previous_slug = None
+    instance._authors = []
+    if instance.pk is None or raw:
+        return
+    instance._previous_slug = Category.objects.filter(
+        pk=instance.pk
+    ).values_list('slug', flat=True).first()
+    instance._authors = list(User.objects.filter(
+        post__category_id=instance.pk
+    ).values_list('username', flat=True).distinct())
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_caches(sender, instance, **kwargs):
+    changed = Post.objects.filter(
+        Q(category_id=instance.pk) | Q(category__isnull=True)
+    ).refresh_visibility()
+    slugs = {instance.slug, getattr(instance, '_previous_slug', None)}
+    slugs.discard(None)
+    authors = getattr(instance, '_authors', [])
+    invalidate_post_counts(feed_scope())
+    shift_counters(
+        (category, author, 1 if is_visible else -1)
+        for _, category, author, is_visible in changed
+    )
+    touch_tags(
+        feed_tag(),
+        'categories',
+        *(category_tag(slug) for slug in slugs),
+        *(author_tag(author) for author in authors),
+    )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=User)
+def create_post_counter(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        field = 'category' if sender is Category else 'author'
+        PostCounter.objects.create(**{field: instance})
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location_caches(sender, instance, **kwargs):
+    touch_tags('locations')
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, raw=False, **kwargs):
+    if created:
+        # Публикация из фикстуры уже хранит comment_count с этим
+        # комментарием.
+        if not raw:
+            Post.objects.filter(pk=instance.post_id).update(
+                comment_count=F('comment_count') + 1
+            )
+        touch_comment_listings(instance)
+    touch_tags(post_tag(instance.post_id))
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1
+    )
+    touch_comment_listings(instance)
+    touch_tags(post_tag(instance.post_id))
+
+
+def touch_comment_listings(comment):
+    """Счётчик комментариев виден в карточках ленты, категории и профиля."""
+    category, author = Post.objects.filter(
+        pk=comment.post_id
+    ).values_list('category__slug', 'author__username').first() or (
+        None, None
+    )
+    tags = [feed_tag()]
+    if category:
+        tags.append(category_tag(category))
+    if author:
+        tags.append(author_tag(author))
+    touch_tags(*tags)
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_caches(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    touch_tags(author_tag(instance.username))
@@ -0,0 +1,239 @@
+"""Потоковая карта сайта: индекс и части до SITEMAP_SHARD_SIZE адресов.
+
+Часть раздела — диапазон первичных ключей длиной SITEMAP_SHARD_SIZE,
+поэтому в ней не больше адресов, чем положено, а выборка не требует
+OFFSET. Адреса выгружаются итератором и сразу отдаются клиенту; готовые
+части (кусками) и индекс хранятся в кэше, пока не изменятся публикации.
+"""
+import hashlib
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import ExpressionWrapper, F, IntegerField, Max
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .cache import SHARED_TAGS, feed_tag, get_tag_versions, page_cache_key
+from .models import Category, Post, User
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+XMLNS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+STATIC_PAGES = ('blog:index', 'pages:about', 'pages:rules')
+
+
+class SitemapSection:
+    """Раздел карты сайта по выборке queryset.
+
+    Адрес строки строится по url_name из её поля url_field, дата
+    изменения берётся из lastmod_field. Разделы не из базы данных
+    переопределяют shards() и urls().
+    """
+
+    name = None
+    queryset = None
+    url_name = None
+    url_field = 'pk'
+    lastmod_field = None
+    aggregated = False
+
+    def get_queryset(self):
+        return self.queryset.all()
+
+    def location(self, row):
+        return reverse(self.url_name, args=(row[self.url_field],))
+
+    def shards(self):
+        """Номера частей раздела и дата последнего изменения в каждой."""
+        shard = ExpressionWrapper(
+            (F('pk') - 1) / settings.SITEMAP_SHARD_SIZE,
+            output_field=IntegerField(),
+        )
+        return self.get_queryset().annotate(shard=shard).values(
+            'shard'
+        ).annotate(lastmod=Max(self.lastmod_field)).order_by(
+            'shard'
+        ).values_list('shard', 'lastmod')
+
+    def urls(self, shard):
+        size = settings.SITEMAP_SHARD_SIZE
+        lastmod = (
+            Max(self.lastmod_field) if self.aggregated
+            else F(self.lastmod_field)
+        )
+        rows = self.get_queryset().filter(
+            pk__gt=shard * size, pk__lte=(shard + 1) * size
+        ).values(*dict.fromkeys(('pk', self.url_field))).annotate(
+            lastmod=lastmod
+        ).order_by('pk')
+        for row in rows.iterator(chunk_size=2000):
+            yield self.location(row), row['lastmod']
+
+
+class PostSection(SitemapSection):
+    name = 'posts'
+    queryset = Post.objects.default_filters()
+    url_name = 'blog:post_detail'
+    lastmod_field = 'updated_at'
+
+
+class CategorySection(SitemapSection):
+    name = 'categories'
+    queryset = Category.objects.filter(is_published=True)
+    url_name = 'blog:category_posts'
+    url_field = 'slug'
+    lastmod_field = 'created_at'
+
+
+class AuthorSection(SitemapSection):
+    name = 'authors'
+    queryset = User.objects.filter(post__is_visible=True)
+    url_name = 'blog:profile'
+    url_field = 'username'
+    lastmod_field = 'post__updated_at'
+    aggregated = True
+
+
+class PageSection(SitemapSection):
+    name = 'pages'
+
+    def shards(self):
+        return ((0, None),)
+
+    def urls(self, shard):
+        if shard == 0:
+            for name in STATIC_PAGES:
+                yield reverse(name), None
+
+
+SECTIONS = {
+    section.name: section
+    for section in (PageSection(), CategorySection(), AuthorSection(),
+                    PostSection())
+}
+
+
+def url_entry(tag, location, lastmod):
+    entry = f'<{tag}><loc>{escape(location)}</loc>'
+    if lastmod is not None:
+        entry += f'<lastmod>{lastmod.isoformat()}</lastmod>'
+    return f'{entry}</{tag}>\n'
+
+
+def sitemap_cache_keys(request, *paths):
+    versions = get_tag_versions((feed_tag(), *SHARED_TAGS))
+    return [
+        page_cache_key(request.build_absolute_uri(path), versions)
+        for path in paths
+    ]
+
+
+def cached_shards(key):
+    """Список частей всех разделов: (раздел, номер, lastmod)."""
+    shards = cache.get(key)
+    if shards is None:
+        shards = [
+            (name, shard, lastmod)
+            for name, section in SECTIONS.items()
+            for shard, lastmod in section.shards()
+        ]
+        cache.set(key, shards, settings.SITEMAP_CACHE_TIMEOUT)
+    return shards
+
+
+def conditional(request, key, lastmod, response_factory):
+    etag = f'W/"{hashlib.md5(key.encode()).hexdigest()}"'
+    last_modified = lastmod.timestamp() if lastmod is not None else None
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        response = response_factory()
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def sitemap_index(request):
+    index_key, = sitemap_cache_keys(request, request.path)
+    shards = cached_shards(f'{index_key}:shards')
+
+    def render():
+        content = [XML_HEADER, f'<sitemapindex xmlns="{XMLNS}">\n']
+        for name, shard, lastmod in shards:
+            location = request.build_absolute_uri(reverse(
+                'blog:sitemap_section',
+                kwargs={'section': name, 'shard': shard},
+            ))
+            content.append(url_entry('sitemap', location, lastmod))
+        content.append('</sitemapindex>\n')
+        return HttpResponse(''.join(content), content_type='application/xml')
+
+    dates = [lastmod for _, _, lastmod in shards if lastmod is not None]
+    return conditional(request, index_key, max(dates, default=None), render)
+
+
+def stream_shard(request, section, shard, key):
+    """Отдаёт часть карты сайта и пишет её в кэш кусками.
+
+    В памяти держится не больше SITEMAP_CACHE_CHUNK_SIZE адресов: каждый
+    кусок сохраняется под своим ключом, а число кусков записывается
+    последним, поэтому недописанная часть из кэша не читается.
+    """
+    chunk = [XML_HEADER, f'<urlset xmlns="{XMLNS}">\n']
+    count = 0
+    for location, lastmod in section.urls(shard):
+        chunk.append(url_entry(
+            'url', request.build_absolute_uri(location), lastmod
+        ))
+        if len(chunk) >= settings.SITEMAP_CACHE_CHUNK_SIZE:
+            content = ''.join(chunk)
+            cache.set(
+                f'{key}:{count}', content, settings.SITEMAP_CACHE_TIMEOUT
+            )
+            count += 1
+            chunk = []
+            yield content
+    chunk.append('</urlset>\n')
+    content = ''.join(chunk)
+    cache.set(f'{key}:{count}', content, settings.SITEMAP_CACHE_TIMEOUT)
+    yield content
+    cache.set(key, count + 1, settings.SITEMAP_CACHE_TIMEOUT)
+
+
+def cached_chunk_keys(key):
+    """Ключи кусков части из кэша или None, если часть не записана."""
+    count = cache.get(key)
+    if count is None:
+        return None
+    keys = [f'{key}:{number}' for number in range(count)]
+    if not all(chunk_key in cache for chunk_key in keys):
+        return None
+    return keys
+
+
+def sitemap_section(request, section, shard):
+    if section not in SECTIONS:
+        raise Http404
+    index_key, key = sitemap_cache_keys(
+        request, reverse('blog:sitemap'), request.path
+    )
+    shards = {
+        (name, number): lastmod
+        for name, number, lastmod in cached_shards(f'{index_key}:shards')
+    }
+    if (section, shard) not in shards:
+        raise Http404
+
+    def render():
+        keys = cached_chunk_keys(key)
+        if keys is not None:
+            content = (cache.get(chunk_key, '') for chunk_key in keys)
+        else:
+            content = stream_shard(request, SECTIONS[section], shard, key)
+        return StreamingHttpResponse(content, content_type='application/xml')
+
+    return conditional(request, key, shards[(section, shard)], render)
@@ -0,0 +1,14 @@
+from django import template
+
+from blog.images import get_srcsets
+
+register = template.Library()
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post, sizes='(max-width: 40rem) 100vw, 40rem'):
+    return {
+        'post': post,
+        'srcsets': get_srcsets(post.image),
+        'sizes': sizes,
+    }
@@ -1,21 +1,54 @@
+from django.conf import settings
 from django.urls import path
 
+from . import sitemaps
+from .feeds import (
+    AuthorPostsAtomFeed, AuthorPostsFeed, CategoryPostsAtomFeed,
+    CategoryPostsFeed, LatestPostsAtomFeed, LatestPostsFeed,
+)
 from .views import (
     CommentCreateView, CommentUpdateView, CommentDeleteView,
-    CategoryPostsListView, PostListView,
+    CategoryPostsListView, PostListView, PostSearchView,
     PostCreateView, PostDeleteView, PostDetailView, PostUpdateView,
     UserDetailView, UserUpdateView,
 )
 
+if settings.ASYNC_READ_VIEWS:
+    from .async_views import (
+        AsyncCategoryPostsListView as CategoryPostsListView,
+        AsyncPostDetailView as PostDetailView,
+        AsyncPostListView as PostListView,
+        AsyncUserDetailView as UserDetailView,
+    )
+
 app_name = 'blog'
 
 urlpatterns = [
     path('', PostListView.as_view(), name='index'),
+    path('search/', PostSearchView.as_view(), name='search'),
+    path('feed/', LatestPostsFeed(), name='feed'),
+    path('feed/atom/', LatestPostsAtomFeed(), name='feed_atom'),
+    path('sitemap.xml', sitemaps.sitemap_index, name='sitemap'),
+    path(
+        'sitemap-<slug:section>-<int:shard>.xml',
+        sitemaps.sitemap_section,
+        name='sitemap_section'
+    ),
     path(
         'profile/<slug:username>/',
         UserDetailView.as_view(),
         name='profile'
     ),
+    path(
+        'profile/<slug:username>/feed/',
+        AuthorPostsFeed(),
+        name='profile_feed'
+    ),
+    path(
+        'profile/<slug:username>/feed/atom/',
+        AuthorPostsAtomFeed(),
+        name='profile_feed_atom'
+    ),
     path(
         'profile/<slug:username>/edit/',
         UserUpdateView.as_view(),
@@ -26,6 +59,16 @@ urlpatterns = [
         CategoryPostsListView.as_view(),
         name='category_posts'
     ),
+    path(
+        'category/<slug:category_slug>/feed/',
+        CategoryPostsFeed(),
+        name='category_feed'
+    ),
+    path(
+        'category/<slug:category_slug>/feed/atom/',
+        CategoryPostsAtomFeed(),
+        name='category_feed_atom'
+    ),
     path(
         'posts/<int:post_id>/',
         PostDetailView.as_view(),
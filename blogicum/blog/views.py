@@ -1,58 +1,90 @@
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.urls import reverse_lazy, reverse
+from django.utils.http import urlencode
 from django.views.generic import (
     ListView, DetailView, UpdateView, DeleteView, CreateView,
 )
 
+from .cache import (
+    author_scope, author_tag, category_tag, feed_scope, feed_tag, post_tag,
+)
 from .forms import CommentForm, PostForm
 from .mixins import (
-    CommentMixin, PaginationMixin, PostMixin, GetSuccessUrlPostDetailMixin
+    AnonymousPageCacheMixin, CommentMixin, ConditionalGetMixin,
+    PaginationMixin, PostMixin, GetSuccessUrlPostDetailMixin,
 )
 from .models import Post, Category, Comment
+from .paginators import KeysetPaginator
 
 
-class PostListView(PaginationMixin, ListView):
+class PostListView(
+    ConditionalGetMixin, AnonymousPageCacheMixin, PaginationMixin, ListView
+):
     model = Post
     template_name = 'blog/index.html'
     context_object_name = 'page_obj'
-    queryset = Post.default_filters.order_by('-pub_date')
+    cursor_pagination = settings.FEED_CURSOR_PAGINATION
+
+    def get_queryset(self):
+        return Post.default_filters.order_by('-pub_date')
+
+    def get_count_scope(self):
+        return feed_scope()
+
+    def get_cache_tags(self):
+        return (feed_tag(),)
+
+    def get_latest_pub_date(self):
+        return Post.default_filters.order_by('-pub_date').values_list(
+            'pub_date', flat=True
+        ).first()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['page_obj'] = self.paginate_queryset(self.queryset)
+        context['page_obj'] = self.paginate_queryset(self.object_list)
         return context
 
 
-class PostDetailView(DetailView):
+class PostDetailView(
+    ConditionalGetMixin, AnonymousPageCacheMixin, DetailView
+):
     model = Post
     template_name = 'blog/detail.html'
     pk_url_kwarg = 'post_id'
 
+    def get_cache_tags(self):
+        return (post_tag(self.kwargs['post_id']),)
+
     def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects,
-            pk=self.kwargs['post_id']
+        post = get_object_or_404(
+            Post.objects.with_related_data(), pk=self.kwargs['post_id']
         )
-        author = obj.author
-        if author != self.request.user:
-            obj = get_object_or_404(
-                Post.default_filters,
-                pk=self.kwargs['post_id']
-            )
-
-        return obj
+        if post.author_id != self.request.user.pk and not post.is_visible:
+            raise Http404
+        return post
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        post = self.get_object()
-        comments = Comment.objects.filter(post=post)
-        context['comments'] = comments
-
+        context['comments'] = self.get_comments_page()
         return context
 
+    def get_comments_page(self):
+        return KeysetPaginator(
+            Comment.objects.filter(
+                post_id=self.kwargs['post_id']
+            ).select_related('author'),
+            settings.COMMENTS_PER_PAGE,
+            key='created_at',
+            descending=False,
+        ).page(self.request.GET.get('comments'))
+
 
 class PostCreateView(LoginRequiredMixin, CreateView):
     model = Post
@@ -94,10 +126,10 @@ class CommentCreateView(
     def get_context_data(self, **kwargs):
         return dict(**super().get_context_data(**kwargs), form=CommentForm())
 
+    @transaction.atomic
     def form_valid(self, form):
         form.instance.author = self.request.user
         form.instance.post = get_object_or_404(Post, pk=self.kwargs['post_id'])
-        form.save()
         return super().form_valid(form)
 
 
@@ -106,10 +138,13 @@ class CommentUpdateView(CommentMixin, UpdateView):
 
 
 class CommentDeleteView(CommentMixin, DeleteView):
-    pass
+
+    @transaction.atomic
+    def delete(self, request, *args, **kwargs):
+        return super().delete(request, *args, **kwargs)
 
 
-class UserDetailView(PaginationMixin, DetailView):
+class UserDetailView(ConditionalGetMixin, PaginationMixin, DetailView):
     model = User
     template_name = 'blog/profile.html'
     context_object_name = 'profile'
@@ -118,14 +153,12 @@ class UserDetailView(PaginationMixin, DetailView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        profile_posts = Post.objects.filter(
-            author=self.get_object()
+        profile_posts = Post.objects.with_related_data()
+        if self.object != self.request.user:
+            profile_posts = Post.default_filters
+        profile_posts = profile_posts.filter(
+            author=self.object
         ).order_by('-pub_date')
-        author = self.kwargs['username']
-        if author != self.request.user.username:
-            profile_posts = Post.default_filters.filter(
-                author=self.get_object()
-            ).order_by('-pub_date')
 
         context['page_obj'] = self.paginate_queryset(profile_posts)
         return context
@@ -133,6 +166,24 @@ class UserDetailView(PaginationMixin, DetailView):
     def get_object(self, queryset=None):
         return get_object_or_404(User, username=self.kwargs['username'])
 
+    def get_count_scope(self):
+        return author_scope(self.kwargs['username'], own=True)
+
+    def get_post_counter(self):
+        if self.kwargs['username'] != self.request.user.username:
+            return ('author', self.kwargs['username'])
+        return None
+
+    def get_cache_tags(self):
+        return (author_tag(self.kwargs['username']),)
+
+    def get_latest_pub_date(self):
+        if self.kwargs['username'] == self.request.user.username:
+            return None
+        return Post.default_filters.filter(
+            author__username=self.kwargs['username']
+        ).order_by('-pub_date').values_list('pub_date', flat=True).first()
+
 
 class UserUpdateView(LoginRequiredMixin, UpdateView):
     model = User
@@ -150,22 +201,65 @@ class UserUpdateView(LoginRequiredMixin, UpdateView):
         )
 
 
-class CategoryPostsListView(PaginationMixin, ListView):
+class CategoryPostsListView(
+    ConditionalGetMixin, AnonymousPageCacheMixin, PaginationMixin, ListView
+):
     model = Post
     template_name = 'blog/category.html'
     context_object_name = 'page_obj'
 
+    def get_category(self):
+        """Категория вместе с датой её последней видимой публикации.
+
+        Первым её запрашивает ConditionalGetMixin, поэтому несуществующая
+        или скрытая категория даёт 404 до выборки публикаций.
+        """
+        if not hasattr(self, '_category'):
+            latest_pub_date = Post.objects.default_filters().filter(
+                category=OuterRef('pk')
+            ).order_by('-pub_date').values('pub_date')[:1]
+            self._category = get_object_or_404(
+                Category.objects.annotate(
+                    latest_pub_date=Subquery(latest_pub_date)
+                ),
+                slug=self.kwargs['category_slug'],
+                is_published=True,
+            )
+        return self._category
+
     def get_queryset(self):
         return Post.default_filters.filter(
-            category__slug=self.kwargs['category_slug']
+            category=self.get_category()
         ).order_by('-pub_date')
 
+    def get_post_counter(self):
+        return ('category', self.kwargs['category_slug'])
+
+    def get_cache_tags(self):
+        return (category_tag(self.kwargs['category_slug']),)
+
+    def get_latest_pub_date(self):
+        return self.get_category().latest_pub_date
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        category = get_object_or_404(
-            Category, slug=self.kwargs['category_slug'], is_published=True
-        )
-        context['category'] = category
-        page_obj = self.get_queryset()
-        context['page_obj'] = self.paginate_queryset(page_obj)
+        context['category'] = self.get_category()
+        context['page_obj'] = self.paginate_queryset(self.object_list)
+        return context
+
+
+class PostSearchView(PaginationMixin, ListView):
+    model = Post
+    template_name = 'blog/search.html'
+    context_object_name = 'page_obj'
+
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()
+        return Post.default_filters.search(self.query)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        context['pagination_query'] = urlencode({'q': self.query}) + '&'
+        context['page_obj'] = self.paginate_queryset(self.object_list)
         return context
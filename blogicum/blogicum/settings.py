@@ -1,3 +1,5 @@
+import os
+import tempfile
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -23,6 +25,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.ServerTimingMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -34,6 +38,21 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'blogicum.urls'
 
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.performance': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': True,
+        },
+    },
+}
+
 TEMPLATES_DIR = BASE_DIR / 'templates'
 
 TEMPLATES = [
@@ -62,6 +81,84 @@ DATABASES = {
     }
 }
 
+# Профиль SQLite для нагруженного сервера (BLOGICUM_SQLITE_PROFILE=production):
+# WAL не даёт записи блокировать чтение, транзакции сразу берут блокировку
+# записи, соединения живут между запросами.
+SQLITE_PRODUCTION_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'busy_timeout': 5000,
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,  # 64 МиБ
+}
+if os.getenv('BLOGICUM_SQLITE_PROFILE') == 'production':
+    DATABASES['default'].update({
+        'ENGINE': 'core.backends.sqlite3',
+        'OPTIONS': {
+            'init_command': ';'.join(
+                f'PRAGMA {name} = {value}'
+                for name, value in SQLITE_PRODUCTION_PRAGMAS.items()
+            ),
+            'transaction_mode': 'IMMEDIATE',
+        },
+        'CONN_MAX_AGE': 60 * 10,
+    })
+
+# PostgreSQL (BLOGICUM_DB_ENGINE=postgresql, драйвер psycopg2-binary из
+# requirements.txt). Пул соединений держит внешний пулер: при
+# POSTGRES_POOLER=transaction (PgBouncer в режиме transaction) серверные
+# курсоры отключаются, а соединения с пулером живут между запросами.
+# Часовой пояс сервера должен быть UTC, локаль базы — UTF-8 (в локали C
+# поиск не приводит кириллицу к нижнему регистру).
+if os.getenv('BLOGICUM_DB_ENGINE') == 'postgresql':
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.getenv('POSTGRES_DB', 'blogicum'),
+        'USER': os.getenv('POSTGRES_USER', 'blogicum'),
+        'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+        'HOST': os.getenv('POSTGRES_HOST', 'localhost'),
+        'PORT': os.getenv('POSTGRES_PORT', '5432'),
+        'CONN_MAX_AGE': int(os.getenv('POSTGRES_CONN_MAX_AGE', '600')),
+        'DISABLE_SERVER_SIDE_CURSORS': (
+            os.getenv('POSTGRES_POOLER') == 'transaction'
+        ),
+    }
+
+# Реплика только для чтения: копия db.sqlite3 для проверки или
+# сервер PostgreSQL с теми же настройками, кроме адреса.
+REPLICA_DB_PATH = os.getenv('BLOGICUM_REPLICA_DB')
+if REPLICA_DB_PATH:
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': f'file:{REPLICA_DB_PATH}?mode=ro',
+        'OPTIONS': {'uri': True},
+        'CONN_MAX_AGE': DATABASES['default'].get('CONN_MAX_AGE', 0),
+        'TEST': {'MIRROR': 'default'},
+    }
+if os.getenv('POSTGRES_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.getenv('POSTGRES_REPLICA_HOST'),
+        'PORT': os.getenv(
+            'POSTGRES_REPLICA_PORT', DATABASES['default']['PORT']
+        ),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Кэш общий для всех процессов: версии тегов, которые меняют
+# publish_scheduled и process_image_jobs, должны видеть веб-процессы.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv(
+            'BLOGICUM_CACHE_DIR',
+            os.path.join(tempfile.gettempdir(), 'blogicum-cache'),
+        ),
+    }
+}
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -115,3 +212,54 @@ LOGIN_REDIRECT_URL = 'blog:index'
 LOGIN_URL = 'login'
 """Константы для проекта"""
 POSTS_PER_PAGE = 10
+COMMENTS_PER_PAGE = 20
+# Курсорная пагинация ленты: без COUNT(*) и OFFSET, только «назад/вперёд».
+FEED_CURSOR_PAGINATION = False
+# Время жизни закэшированного количества публикаций для пагинатора, сек.
+POST_COUNT_CACHE_TIMEOUT = 60 * 15
+# Время жизни страниц, закэшированных для анонимных читателей, сек.
+PAGE_CACHE_TIMEOUT = 60 * 5
+# RSS и Atom ленты: число публикаций и время жизни готового XML, сек.
+FEED_ITEMS = 20
+FEED_CACHE_TIMEOUT = 60 * 60
+# Карта сайта: адресов в одной части и время жизни готового XML, сек.
+SITEMAP_SHARD_SIZE = 50000
+SITEMAP_CACHE_TIMEOUT = 60 * 60 * 6
+# Адресов в одной записи кэша: часть карты сайта пишется в кэш кусками,
+# чтобы не собирать её в памяти целиком.
+SITEMAP_CACHE_CHUNK_SIZE = 1000
+# Страницы, которые читают с реплики, и сколько секунд после записи
+# пользователь читает из основной базы. Недоступную реплику пробуем
+# снова через REPLICA_RETRY_INTERVAL сек.
+REPLICA_VIEWS = (
+    'blog:index',
+    'blog:search',
+    'blog:category_posts',
+    'blog:profile',
+    'blog:feed',
+    'blog:feed_atom',
+    'blog:category_feed',
+    'blog:category_feed_atom',
+    'blog:profile_feed',
+    'blog:profile_feed_atom',
+)
+REPLICA_STICKY_COOKIE = 'primary_reads'
+REPLICA_STICKY_TIMEOUT = 30
+REPLICA_RETRY_INTERVAL = 30
+# Очередь обработки изображений (manage.py process_image_jobs).
+IMAGE_JOB_MAX_ATTEMPTS = 5
+IMAGE_JOB_RETRY_DELAY = 30
+IMAGE_JOB_LEASE = 60 * 10
+# Через сколько секунд задача, исчерпавшая попытки, выполняется снова.
+IMAGE_JOB_REQUEUE_INTERVAL = 60 * 60
+# Доля запросов, для которых ServerTimingMiddleware замеряет время, 0..1:
+# при отладке все, иначе один из ста.
+SERVER_TIMING_SAMPLE_RATE = float(
+    os.getenv('BLOGICUM_SERVER_TIMING_SAMPLE_RATE', '1' if DEBUG else '0.01')
+)
+# Отдавать замеры клиенту в заголовке Server-Timing; без отладки только в лог.
+SERVER_TIMING_HEADER = (
+    os.getenv('BLOGICUM_SERVER_TIMING_HEADER', '1' if DEBUG else '0') == '1'
+)
+# Асинхронные страницы чтения; включаются в blogicum/asgi.py.
+ASYNC_READ_VIEWS = os.getenv('BLOGICUM_ASYNC_VIEWS', '') == '1'
@@ -0,0 +1,33 @@
+"""SQLite с параметрами init_command и transaction_mode из Django 5.1.
+
+init_command выполняется на каждом новом соединении (PRAGMA через «;»),
+transaction_mode задаёт вид BEGIN для transaction.atomic: с IMMEDIATE
+транзакция, которая сначала читает, а потом пишет, ждёт busy_timeout
+вместо немедленной ошибки «database is locked».
+"""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    init_command = None
+    transaction_mode = None
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        self.init_command = kwargs.pop('init_command', None)
+        self.transaction_mode = kwargs.pop('transaction_mode', None)
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        if self.init_command:
+            for statement in self.init_command.split(';'):
+                if statement.strip():
+                    conn.execute(statement)
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        if self.transaction_mode is None:
+            super()._start_transaction_under_autocommit()
+        else:
+            self.cursor().execute(f'BEGIN {self.transaction_mode}')
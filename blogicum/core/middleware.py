@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .routers import replica_available, use_replica
+
+logger = logging.getLogger('core.performance')
+
+current_timings = ContextVar('current_timings', default=None)
+
+
+class RequestTimings:
+    """Время обработки запроса, запросов к базе и отрисовки шаблонов."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_started = None
+
+    def record_query(self, elapsed):
+        with self.lock:
+            self.db_queries += 1
+            self.db_time += elapsed
+
+    def start_template(self):
+        self.template_started = time.perf_counter()
+
+    def finish_template(self, response):
+        if self.template_started is not None:
+            self.template_time += time.perf_counter() - self.template_started
+            self.template_started = None
+
+    def metrics(self):
+        return {
+            'total': (time.perf_counter() - self.started) * 1000,
+            'db': self.db_time * 1000,
+            'tpl': self.template_time * 1000,
+        }
+
+
+def time_query(execute, sql, params, many, context):
+    timings = current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.record_query(time.perf_counter() - started)
+
+
+def install_query_timer(connection):
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+def install_on_new_connection(sender, connection, **kwargs):
+    install_query_timer(connection)
+
+
+connection_created.connect(install_on_new_connection)
+
+
+class ServerTimingMiddleware:
+    """Замеряет выборку запросов и пишет результат в лог.
+
+    Замер хранится в контекстной переменной, поэтому в него попадают и
+    запросы асинхронных представлений из рабочих потоков. Заголовок
+    Server-Timing отдаётся, только если включён SERVER_TIMING_HEADER.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Так же помечает себя MiddlewareMixin: обработчик ASGI
+            # будет дожидаться результата __call__.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        timings = self.start(request)
+        if timings is None:
+            return self.get_response(request)
+        token = current_timings.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request):
+        timings = self.start(request)
+        if timings is None:
+            return await self.get_response(request)
+        token = current_timings.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self.finish(request, response, timings)
+
+    def start(self, request):
+        if random.random() >= settings.SERVER_TIMING_SAMPLE_RATE:
+            return None
+        for connection in connections.all():
+            install_query_timer(connection)
+        request.timings = RequestTimings()
+        return request.timings
+
+    def finish(self, request, response, timings):
+        metrics = timings.metrics()
+        if settings.SERVER_TIMING_HEADER:
+            response['Server-Timing'] = ', '.join([
+                f'{name};dur={value:.1f}' for name, value in metrics.items()
+            ] + [f'queries;desc="{timings.db_queries}"'])
+        view_name = getattr(request.resolver_match, 'view_name', None)
+        logger.info(
+            'view=%s method=%s status=%s total_ms=%.1f db_ms=%.1f '
+            'db_queries=%d template_ms=%.1f',
+            view_name or '-', request.method, response.status_code,
+            metrics['total'], metrics['db'], timings.db_queries,
+            metrics['tpl'],
+            extra={
+                'view_name': view_name,
+                'status_code': response.status_code,
+                'db_queries': timings.db_queries,
+                **{f'{name}_ms': value for name, value in metrics.items()},
+            },
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        timings = getattr(request, 'timings', None)
+        if timings is not None:
+            timings.start_template()
+            response.add_post_render_callback(timings.finish_template)
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """Читает GET-запросы к страницам из REPLICA_VIEWS с реплики.
+
+    Запрос с другим методом ставит cookie REPLICA_STICKY_COOKIE, и
+    REPLICA_STICKY_TIMEOUT секунд после этого пользователь читает из
+    основной базы, чтобы сразу видеть свои изменения.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            use_replica.set(False)
+        if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            response.set_cookie(
+                settings.REPLICA_STICKY_COOKIE, '1',
+                max_age=settings.REPLICA_STICKY_TIMEOUT,
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            request.method in ('GET', 'HEAD')
+            and request.resolver_match.view_name in settings.REPLICA_VIEWS
+            and settings.REPLICA_STICKY_COOKIE not in request.COOKIES
+            and replica_available()
+        ):
+            use_replica.set(True)
@@ -0,0 +1,68 @@
+"""Чтение страниц-списков с реплики базы данных.
+
+ReplicaRoutingMiddleware включает реплику на время GET-запроса к
+страницам из REPLICA_VIEWS, а ReplicaRouter направляет на неё чтение.
+Запись всегда идёт в основную базу; после записи пользователь читает
+из неё же, пока реплика не догонит изменения.
+"""
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+REPLICA_DB_ALIAS = 'replica'
+
+use_replica = ContextVar('use_replica', default=False)
+_replica_down_until = 0.0
+
+
+def replica_available():
+    """Доступна ли реплика; после сбоя ждём REPLICA_RETRY_INTERVAL сек."""
+    global _replica_down_until
+    if REPLICA_DB_ALIAS not in connections:
+        return False
+    if time.monotonic() < _replica_down_until:
+        return False
+    try:
+        connections[REPLICA_DB_ALIAS].ensure_connection()
+    except DatabaseError:
+        _replica_down_until = (
+            time.monotonic() + settings.REPLICA_RETRY_INTERVAL
+        )
+        return False
+    return True
+
+
+def reading_replica():
+    """Читает ли запрос с реплики.
+
+    Данные реплики могут отставать, поэтому их нельзя сохранять в кэш под
+    текущими версиями тегов или записывать в счётчики.
+    """
+    return use_replica.get()
+
+
+def reset_replica_state():
+    global _replica_down_until
+    _replica_down_until = 0.0
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if (
+            use_replica.get()
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return REPLICA_DB_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_DB_ALIAS
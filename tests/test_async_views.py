@@ -0,0 +1,148 @@
+import asyncio
+import threading
+
+from asgiref.sync import async_to_sync
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import close_old_connections, connection
+from django.db.backends.signals import connection_created
+from django.http import Http404
+from django.test import AsyncRequestFactory
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+def call_async_view(view_class, path, user=None, **kwargs):
+    request = AsyncRequestFactory().get(path)
+    request.user = user or AnonymousUser()
+    try:
+        response = async_to_sync(view_class.as_view())(request, **kwargs)
+    except Http404:
+        return None
+    if hasattr(response, "render"):
+        response.render()
+    return response
+
+
+def test_async_pages_match_sync_pages(
+        client, many_posts_with_published_locations, published_category,
+        user
+):
+    from blog.async_views import (
+        AsyncCategoryPostsListView, AsyncPostDetailView, AsyncPostListView,
+        AsyncUserDetailView,
+    )
+
+    post = many_posts_with_published_locations[0]
+    pages = [
+        (AsyncPostListView, "/?page=2", {}),
+        (
+            AsyncCategoryPostsListView,
+            f"/category/{published_category.slug}/",
+            {"category_slug": published_category.slug},
+        ),
+        (
+            AsyncUserDetailView,
+            f"/profile/{user.username}/",
+            {"username": user.username},
+        ),
+        (AsyncPostDetailView, f"/posts/{post.id}/", {"post_id": post.id}),
+    ]
+    for view_class, path, kwargs in pages:
+        expected = client.get(path)
+        cache.clear()
+        response = call_async_view(view_class, path, **kwargs)
+        assert response.status_code == expected.status_code == 200
+        assert "ETag" in response
+        if "page_obj" in response.context_data:
+            assert [p.pk for p in response.context_data["page_obj"]] == [
+                p.pk for p in expected.context["page_obj"]
+            ], f"Асинхронная страница `{path}` отличается от синхронной."
+
+
+def test_async_views_keep_visibility_rules(
+        unpublished_posts_with_published_locations, user
+):
+    from blog.async_views import (
+        AsyncCategoryPostsListView, AsyncPostDetailView,
+    )
+
+    post = unpublished_posts_with_published_locations[0]
+    assert call_async_view(
+        AsyncPostDetailView, f"/posts/{post.id}/", post_id=post.id
+    ) is None
+    assert call_async_view(
+        AsyncPostDetailView, f"/posts/{post.id}/", user=user, post_id=post.id
+    ).status_code == 200
+    assert call_async_view(
+        AsyncCategoryPostsListView, "/category/missing/",
+        category_slug="missing",
+    ) is None
+
+
+def test_async_views_are_coroutines_for_asgi_handler():
+    from blog.async_views import AsyncPostListView
+
+    assert asyncio.iscoroutinefunction(AsyncPostListView.as_view()), (
+        "Обработчик ASGI должен получать асинхронное представление."
+    )
+
+
+def test_async_view_runs_lookups_concurrently(
+        monkeypatch, many_posts_with_published_locations, published_category
+):
+    from blog.async_views import AsyncCategoryPostsListView
+    from blog.views import CategoryPostsListView
+
+    # Каждая выборка ждёт другую: при последовательном выполнении
+    # барьер не дождётся второго потока.
+    barrier = threading.Barrier(2, timeout=5)
+    for name in ("get_tag_versions", "get_category"):
+        lookup = getattr(CategoryPostsListView, name)
+
+        def waiting(self, lookup=lookup):
+            barrier.wait()
+            return lookup(self)
+
+        monkeypatch.setattr(CategoryPostsListView, name, waiting)
+    response = call_async_view(
+        AsyncCategoryPostsListView,
+        f"/category/{published_category.slug}/",
+        category_slug=published_category.slug,
+    )
+    assert response.status_code == 200
+
+
+def test_async_view_closes_lookup_connections(
+        monkeypatch, many_posts_with_published_locations, user
+):
+    import blog.async_views
+    from blog.async_views import AsyncUserDetailView
+
+    # Соединение тестовой базы SQLite в памяти не закрывается, поэтому
+    # проверяется, что каждый открывший соединение поток его отпускает.
+    opened, released = set(), set()
+
+    def record(sender, connection, **kwargs):
+        opened.add(threading.get_ident())
+
+    def release():
+        released.add(threading.get_ident())
+        close_old_connections()
+
+    monkeypatch.setattr(blog.async_views, "close_old_connections", release)
+    connection_created.connect(record)
+    try:
+        connection.ensure_connection()
+        response = call_async_view(
+            AsyncUserDetailView, f"/profile/{user.username}/",
+            username=user.username,
+        )
+    finally:
+        connection_created.disconnect(record)
+    assert response.status_code == 200
+    assert opened and opened <= released, (
+        "Убедитесь, что потоки выборок отпускают свои соединения"
+        " по окончании выборки."
+    )
@@ -0,0 +1,84 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize(
+    "url",
+    ["/", "/category/{slug}/", "/posts/{post_id}/", "/profile/{username}/"],
+)
+@pytest.mark.parametrize("client_name", ["client", "user_client"])
+def test_conditional_get(
+        url, client_name, request, post_with_published_location,
+        mixer: Mixer
+):
+    client = request.getfixturevalue(client_name)
+    post = post_with_published_location
+    url = url.format(
+        slug=post.category.slug,
+        post_id=post.id,
+        username=post.author.username,
+    )
+    response = client.get(url)
+    etag = response.get("ETag")
+    assert etag, f"Убедитесь, что страница `{url}` отдаёт заголовок ETag."
+
+    not_modified = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert not_modified.status_code == 304, (
+        f"Убедитесь, что страница `{url}` отвечает 304 на запрос"
+        " с совпадающим ETag."
+    )
+    assert not not_modified.templates
+
+    mixer.blend("blog.Comment", post=post)
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+        "Убедитесь, что новый комментарий меняет ETag страницы."
+    )
+
+
+def test_last_modified_for_anonymous(client, post_with_published_location):
+    response = client.get("/")
+    last_modified = response.get("Last-Modified")
+    assert last_modified
+    assert client.get(
+        "/", HTTP_IF_MODIFIED_SINCE=last_modified
+    ).status_code == 304
+
+
+def test_scheduled_post_changes_etag(
+        client, post_with_published_location, mixer: Mixer
+):
+    scheduled = mixer.blend(
+        "blog.Post",
+        author=post_with_published_location.author,
+        category=post_with_published_location.category,
+        is_published=True,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+    etag = client.get("/")["ETag"]
+    type(scheduled).objects.filter(pk=scheduled.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1)
+    )
+    call_command("publish_scheduled", "--once")
+    assert client.get("/", HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+        "Убедитесь, что наступление отложенной публикации меняет ETag ленты."
+    )
+
+
+def test_new_csrf_token_changes_etag(
+        user_client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    response = user_client.get(url)
+    etag = response["ETag"]
+    assert user_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    user_client.cookies["csrftoken"] = "a" * 64
+    assert user_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+        "Убедитесь, что после смены CSRF-токена (нового входа) страница с"
+        " формой отдаётся заново, а не из кэша браузера."
+    )
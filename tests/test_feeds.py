@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize(
+    "url, content_type",
+    [
+        ("/feed/", "application/rss+xml"),
+        ("/feed/atom/", "application/atom+xml"),
+        ("/category/{slug}/feed/", "application/rss+xml"),
+        ("/category/{slug}/feed/atom/", "application/atom+xml"),
+        ("/profile/{username}/feed/", "application/rss+xml"),
+        ("/profile/{username}/feed/atom/", "application/atom+xml"),
+    ],
+)
+def test_feeds(
+        url, content_type, client, settings, user, published_category,
+        many_posts_with_published_locations, mixer: Mixer
+):
+    settings.FEED_ITEMS = 5
+    scheduled = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(days=1),
+    )
+    url = url.format(slug=published_category.slug, username=user.username)
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith(content_type)
+    assert len(context.captured_queries) <= 2, (
+        "Убедитесь, что лента строится одним запросом к публикациям."
+    )
+    content = response.content.decode()
+    latest = sorted(
+        many_posts_with_published_locations,
+        key=lambda post: post.pub_date, reverse=True,
+    )
+    assert content.count(f"/posts/{latest[0].pk}/") >= 1
+    assert f"/posts/{latest[5].pk}/" not in content, (
+        "Убедитесь, что лента ограничена настройкой FEED_ITEMS."
+    )
+    assert f"/posts/{scheduled.pk}/" not in content
+
+    with CaptureQueriesContext(connection) as context:
+        cached = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert cached.status_code == 304, (
+        "Убедитесь, что лента поддерживает условные запросы."
+    )
+    assert not context.captured_queries, (
+        "Убедитесь, что повторный запрос ленты берётся из кэша."
+    )
+
+    latest[0].title = "Обновлённый заголовок"
+    latest[0].save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == 200, (
+        "Убедитесь, что изменение публикации сбрасывает кэш ленты."
+    )
+    assert "Обновлённый заголовок" in response.content.decode()
+
+
+def test_unpublished_category_feed_not_found(client, mixer: Mixer):
+    category = mixer.blend("blog.Category", is_published=False)
+    assert client.get(f"/category/{category.slug}/feed/").status_code == 404
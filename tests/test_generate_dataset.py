@@ -0,0 +1,55 @@
+import pytest
+from django.core.management import call_command
+from django.db.models import Count, Q
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_generated_dataset_loads_consistently(tmp_path):
+    from blog.counters import get_post_count
+    from blog.models import Category, Comment, Post
+
+    path = tmp_path / "dataset.json"
+    call_command(
+        "generate_dataset", users=3, categories=2, locations=2, posts=30,
+        comments=120, scheduled=0.2, unpublished=0.2, output=str(path),
+    )
+    call_command("loaddata", str(path), verbosity=0)
+
+    assert Post.objects.count() == 30
+    assert Comment.objects.count() == 120
+    posts = Post.objects.annotate(comments=Count("comment"))
+    assert posts.exclude(comments=0).exists()
+    for post in posts:
+        assert post.comment_count == post.comments, (
+            "Убедитесь, что после loaddata comment_count совпадает с"
+            " количеством комментариев."
+        )
+    visible = Q(
+        is_published=True,
+        category__is_published=True,
+        pub_date__lt=timezone.now(),
+    )
+    assert not Post.objects.filter(visible, is_visible=False).exists()
+    assert not Post.objects.filter(~visible, is_visible=True).exists()
+    for category in Category.objects.all():
+        assert get_post_count("category", category.slug) == (
+            Post.objects.filter(category=category, is_visible=True).count()
+        )
+
+
+def test_dumpdata_round_trip_keeps_comment_count(
+        tmp_path, post_with_published_location, mixer
+):
+    from blog.models import Post
+
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post, author=post.author)
+    path = tmp_path / "blog.json"
+    call_command("dumpdata", "blog.post", "blog.comment", output=str(path))
+    Post.objects.all().delete()
+    call_command("loaddata", str(path), verbosity=0)
+    assert Post.objects.get(pk=post.pk).comment_count == 2, (
+        "Убедитесь, что loaddata не увеличивает comment_count повторно."
+    )
@@ -0,0 +1,215 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def test_upload_is_processed_in_background(
+        client, post_with_published_location
+):
+    from blog.image_queue import queue_depth
+    from blog.images import VARIANT_WIDTHS, variant_name
+
+    post = post_with_published_location
+    storage = post.image.storage
+    assert queue_depth()["pending"] == 1, (
+        "Убедитесь, что загруженное изображение ставится в очередь"
+        " обработки, а не обрабатывается во время запроса."
+    )
+    content = client.get("/").content.decode()
+    assert post.image.url in content and "srcset=" not in content, (
+        "Пока копии не готовы, карточка должна показывать оригинал."
+    )
+
+    call_command("process_image_jobs", "--once")
+    assert queue_depth()["done"] == 1
+    for width in VARIANT_WIDTHS:
+        for extension in ("webp", "jpg"):
+            name = variant_name(post.image.name, width, extension)
+            assert storage.exists(name), (
+                "Убедитесь, что обработчик очереди создаёт уменьшенные"
+                " копии изображения."
+            )
+
+    content = client.get("/").content.decode()
+    assert 'loading="lazy"' in content
+    assert "srcset=" in content and "image/webp" in content, (
+        "Убедитесь, что после обработки карточка поста выводит"
+        " изображение через srcset."
+    )
+
+
+def test_failed_job_is_retried(post_with_published_location, settings):
+    from blog.image_queue import process_jobs
+    from blog.models import ImageJob
+
+    post = post_with_published_location
+    post.image.storage.delete(post.image.name)
+
+    assert process_jobs() == (0, 1)
+    job = ImageJob.objects.get()
+    assert job.status == ImageJob.Status.PENDING
+    assert job.run_after > timezone.now()
+    assert job.last_error
+
+    for _ in range(settings.IMAGE_JOB_MAX_ATTEMPTS - 1):
+        ImageJob.objects.update(run_after=timezone.now() - timedelta(1))
+        process_jobs()
+    assert ImageJob.objects.get().status == ImageJob.Status.FAILED
+
+
+def test_backfill_command_is_idempotent(post_with_published_location):
+    from blog.images import VARIANT_WIDTHS, variant_name
+
+    post = post_with_published_location
+    storage = post.image.storage
+    name = variant_name(post.image.name, VARIANT_WIDTHS[-1], "jpg")
+
+    call_command("build_image_variants")
+    assert storage.exists(name)
+    modified = storage.get_modified_time(name)
+    call_command("build_image_variants")
+    assert storage.get_modified_time(name) == modified
+
+
+def test_backfill_survives_decompression_bomb(
+        post_with_published_location, mixer, monkeypatch
+):
+    from io import StringIO
+
+    from PIL import Image
+
+    from blog.management.commands import build_image_variants
+
+    mixer.blend(
+        "blog.Post", image=post_with_published_location.image.name
+    )
+    calls = []
+
+    def build(image, force=False):
+        calls.append(image.name)
+        raise Image.DecompressionBombError("слишком большое изображение")
+
+    monkeypatch.setattr(build_image_variants, "build_variants", build)
+    out = StringIO()
+    call_command("build_image_variants", stdout=out, stderr=StringIO())
+    assert len(calls) == 2, (
+        "Убедитесь, что ошибка одного изображения не останавливает"
+        " заполнение копий."
+    )
+    assert "ошибок: 2" in out.getvalue()
+
+
+def test_variant_names_keep_the_extension():
+    from blog.images import variant_name
+
+    assert variant_name("posts_images/cat.jpg", 320, "webp") != (
+        variant_name("posts_images/cat.png", 320, "webp")
+    ), (
+        "Убедитесь, что копии изображений с одинаковым именем, но разным"
+        " расширением не перезаписывают друг друга."
+    )
+
+
+def test_srcset_uses_actual_width(post_with_published_location):
+    from blog.images import build_variants, get_srcsets
+
+    image = post_with_published_location.image
+    build_variants(image)
+    srcsets = get_srcsets(image)
+    for extension in ("webp", "jpg"):
+        assert srcsets[extension].endswith(" 100w"), (
+            "Копии не увеличиваются, поэтому srcset должен указывать"
+            " настоящую ширину изображения."
+        )
+        assert ", " not in srcsets[extension], (
+            "Копии одной ширины не должны повторяться в srcset."
+        )
+
+
+def test_unexpected_error_fails_only_the_job(
+        post_with_published_location, monkeypatch
+):
+    from blog import image_queue
+    from blog.models import ImageJob
+
+    def explode(image):
+        raise ValueError("повреждённое изображение")
+
+    monkeypatch.setattr(image_queue, "build_variants", explode)
+    assert image_queue.process_jobs() == (0, 1), (
+        "Убедитесь, что любая ошибка обработки изображения помечает задачу"
+        " как неудачную и не останавливает обработчик."
+    )
+    job = ImageJob.objects.get()
+    assert job.status == ImageJob.Status.PENDING
+    assert "ValueError" in job.last_error
+
+
+def test_failed_job_is_requeued_later(
+        post_with_published_location, settings, monkeypatch
+):
+    from blog import image_queue
+    from blog.models import ImageJob
+
+    ImageJob.objects.update(
+        status=ImageJob.Status.FAILED,
+        attempts=settings.IMAGE_JOB_MAX_ATTEMPTS,
+        run_after=timezone.now() - timedelta(seconds=1),
+    )
+    assert image_queue.process_jobs() == (1, 0), (
+        "Убедитесь, что задача, исчерпавшая попытки, со временем снова"
+        " выполняется."
+    )
+    assert ImageJob.objects.get().status == ImageJob.Status.DONE
+
+    def explode(image):
+        raise ValueError("повреждённое изображение")
+
+    monkeypatch.setattr(image_queue, "build_variants", explode)
+    ImageJob.objects.update(
+        status=ImageJob.Status.FAILED,
+        run_after=timezone.now() - timedelta(seconds=1),
+    )
+    assert image_queue.process_jobs() == (0, 1)
+    job = ImageJob.objects.get()
+    assert job.status == ImageJob.Status.FAILED
+    assert job.run_after > timezone.now() + timedelta(
+        seconds=settings.IMAGE_JOB_REQUEUE_INTERVAL - 60
+    ), "Повторять неудачную задачу нужно не чаще IMAGE_JOB_REQUEUE_INTERVAL."
+
+
+def test_image_job_on_due_post_keeps_counters(
+        post_with_published_location, published_category, monkeypatch
+):
+    from blog.counters import get_post_count
+    from blog.image_queue import process_jobs
+    from blog.models import Post
+    from blog.publishing import publish_due_posts
+
+    post = post_with_published_location
+    now = timezone.now()
+    post.pub_date = now + timedelta(hours=1)
+    post.save()
+    assert get_post_count("category", published_category.slug) == 0
+
+    monkeypatch.setattr(timezone, "now", lambda: now + timedelta(hours=2))
+    assert process_jobs() == (1, 0)
+    publish_due_posts()
+    real = Post.objects.filter(
+        category=published_category, is_visible=True
+    ).count()
+    assert real == 1
+    assert get_post_count("category", published_category.slug) == real, (
+        "Убедитесь, что обработка изображения не сдвигает счётчик"
+        " публикаций."
+    )
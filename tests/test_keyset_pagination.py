@@ -0,0 +1,119 @@
+import base64
+import json
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts_with_equal_dates(mixer: Mixer, user, published_category):
+    pub_date = timezone.now() - timedelta(days=1)
+    return mixer.cycle(N_PER_PAGE * 2 + 5).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=mixer.sequence(
+            *(pub_date - timedelta(hours=i // 3) for i in range(30))
+        ),
+    )
+
+
+def test_keyset_paginator_walks_forward_and_back(posts_with_equal_dates):
+    from blog.models import Post
+    from blog.paginators import KeysetPaginator
+
+    expected = list(
+        Post.objects.order_by("-pub_date", "-pk").values_list("pk", flat=True)
+    )
+    paginator = KeysetPaginator(Post.objects.all(), N_PER_PAGE)
+
+    pages, cursor = [], None
+    while True:
+        page = paginator.page(cursor)
+        pages.append(page)
+        if not page.has_next():
+            break
+        cursor = page.next_cursor
+    walked = [post.pk for page in pages for post in page]
+    assert walked == expected, (
+        "Убедитесь, что курсорная пагинация проходит все публикации"
+        " по порядку без пропусков и повторов, в том числе при равных"
+        " датах публикации."
+    )
+    assert not pages[0].has_previous()
+
+    previous = paginator.page(pages[-1].previous_cursor)
+    assert [post.pk for post in previous] == [post.pk for post in pages[-2]], (
+        "Убедитесь, что ссылка «назад» курсорной пагинации возвращает"
+        " предыдущую страницу."
+    )
+
+
+def test_keyset_paginator_ignores_broken_cursor(posts_with_equal_dates):
+    from blog.models import Post
+    from blog.paginators import KeysetPaginator
+
+    paginator = KeysetPaginator(Post.objects.all(), N_PER_PAGE)
+    first_page = [post.pk for post in paginator.page()]
+    assert [post.pk for post in paginator.page("not-a-cursor")] == first_page
+
+
+def test_index_cursor_mode(posts_with_equal_dates, client, monkeypatch):
+    from blog.views import PostListView
+
+    monkeypatch.setattr(PostListView, "cursor_pagination", True)
+    response = client.get("/")
+    page_obj = response.context["page_obj"]
+    assert len(page_obj) == N_PER_PAGE
+    assert f"?cursor={page_obj.next_cursor}" in response.content.decode()
+    assert "?page=" not in response.content.decode()
+
+
+def test_post_detail_paginates_comments(
+        client, post_with_published_location, mixer: Mixer
+):
+    from django.conf import settings
+
+    comments = mixer.cycle(settings.COMMENTS_PER_PAGE + 3).blend(
+        "blog.Comment", post=post_with_published_location
+    )
+    url = f"/posts/{post_with_published_location.id}/"
+    first_page = client.get(url).context["comments"]
+    assert [c.pk for c in first_page] == [
+        c.pk for c in comments[:settings.COMMENTS_PER_PAGE]
+    ], "Убедитесь, что комментарии к посту выводятся постранично."
+
+    second_page = client.get(
+        f"{url}?comments={first_page.next_cursor}"
+    ).context["comments"]
+    assert [c.pk for c in second_page] == [
+        c.pk for c in comments[settings.COMMENTS_PER_PAGE:]
+    ]
+    assert not second_page.has_next()
+
+
+def make_cursor(*parts):
+    raw = json.dumps(list(parts)).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("pk", ["x", [1], None, {"id": 1}, 10 ** 30, -1])
+def test_cursor_with_malformed_pk_is_ignored(
+        pk, client, post_with_published_location, monkeypatch
+):
+    from blog.views import PostListView
+
+    cursor = make_cursor("next", "2020-01-01T00:00:00+00:00", pk)
+    url = f"/posts/{post_with_published_location.id}/"
+    assert client.get(f"{url}?comments={cursor}").status_code == 200
+    monkeypatch.setattr(PostListView, "cursor_pagination", True)
+    assert client.get(f"/?cursor={cursor}").status_code == 200, (
+        "Убедитесь, что курсор с некорректным id открывает первую страницу."
+    )
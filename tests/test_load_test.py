@@ -0,0 +1,63 @@
+import json
+
+import pytest
+from django.test import Client
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+def test_load_test_report(
+        tmp_path, user, many_posts_with_published_locations
+):
+    from blog.management.commands.load_test import Command, Session
+
+    class ClientSession(Session):
+        """Сессия драйвера поверх тестового клиента вместо HTTP."""
+
+        def __init__(self, base_url, timeout):
+            self.client = Client()
+
+        def request(self, path, data=None):
+            if data is None:
+                response = self.client.get(path)
+            else:
+                response = self.client.post(path, data)
+            return response.status_code, response.content.decode()
+
+    class ClientCommand(Command):
+        session_class = ClientSession
+
+    user.set_password("loadtest-password")
+    user.save()
+    path = tmp_path / "report.json"
+    ClientCommand().run_from_argv([
+        "manage.py", "load_test", "--requests", "40", "--concurrency", "1",
+        "--write-share", "0.3", "--output", str(path),
+    ])
+
+    report = json.loads(path.read_text(encoding="utf-8"))
+    assert {
+        "commit", "finished_at", "base_url", "concurrency", "write_share",
+        "duration_s", "requests", "throughput_rps", "routes",
+    } <= set(report)
+    assert report["requests"] == 40
+    assert "blog:add_comment" in report["routes"], (
+        "Убедитесь, что драйвер добавляет комментарии от имени авторов."
+    )
+    for name, route in report["routes"].items():
+        assert route["errors"] == 0, f"Ошибки на адресе `{name}`."
+        assert 0 <= route["p50_ms"] <= route["p95_ms"] <= route["p99_ms"]
+    assert sum(
+        route["requests"] for route in report["routes"].values()
+    ) == report["requests"]
+
+
+@pytest.mark.parametrize(
+    "values, share, expected",
+    [([], 50, None), ([5], 99, 5), (list(range(1, 101)), 95, 95),
+     (list(range(1, 11)), 50, 5), (list(range(1, 11)), 99, 10)],
+)
+def test_percentile_uses_nearest_rank(values, share, expected):
+    from blog.management.commands.load_test import percentile
+
+    assert percentile(values, share) == expected
@@ -0,0 +1,107 @@
+import os
+import subprocess
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_with_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response.content.decode(), len(context.captured_queries)
+
+
+@pytest.mark.parametrize(
+    "url", ["/", "/category/{slug}/", "/posts/{post_id}/"]
+)
+def test_anonymous_page_cache_is_invalidated(
+        url, client, post_with_published_location, mixer: Mixer
+):
+    post = post_with_published_location
+    url = url.format(slug=post.category.slug, post_id=post.id)
+    get_with_queries(client, url)
+    _, cached_queries = get_with_queries(client, url)
+    assert cached_queries <= 1, (
+        "Убедитесь, что повторный запрос анонимного читателя отдаётся"
+        " из кэша: допустим только запрос даты последней публикации"
+        " для валидаторов."
+    )
+
+    mixer.blend("blog.Comment", post=post, text="Свежий комментарий")
+    content, queries = get_with_queries(client, url)
+    assert queries > cached_queries, (
+        "Убедитесь, что новый комментарий сбрасывает кэш страницы."
+    )
+    assert "(1)" in content or "Свежий комментарий" in content
+
+    post.title = "Новый заголовок"
+    post.save()
+    content, _ = get_with_queries(client, url)
+    assert "Новый заголовок" in content
+
+
+def test_logged_in_user_is_not_served_from_cache(
+        client, user_client, post_with_published_location
+):
+    get_with_queries(client, "/")
+    _, queries = get_with_queries(user_client, "/")
+    assert queries > 1, (
+        "Страницы для авторизованных пользователей не должны браться"
+        " из кэша анонимных читателей."
+    )
+
+
+def test_page_cache_shows_published_scheduled_post(
+        client, post_with_published_location, mixer: Mixer
+):
+    scheduled = mixer.blend(
+        "blog.Post",
+        author=post_with_published_location.author,
+        category=post_with_published_location.category,
+        is_published=True,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+    client.get("/")
+    type(scheduled).objects.filter(pk=scheduled.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1)
+    )
+    call_command("publish_scheduled", "--once")
+    content, _ = get_with_queries(client, "/")
+    assert f"/posts/{scheduled.pk}/" in content, (
+        "Убедитесь, что открытие отложенной публикации сбрасывает кэш"
+        " страниц."
+    )
+
+
+def test_worker_process_invalidates_web_cache(
+        client, post_with_published_location
+):
+    post = post_with_published_location
+    client.get("/feed/")
+    type(post).objects.filter(pk=post.pk).update(title="Новый заголовок")
+    # Фоновые команды работают в отдельных процессах.
+    subprocess.run(
+        [
+            sys.executable, "-c",
+            "import django; django.setup();"
+            " from blog.cache import feed_tag, touch_tags;"
+            " touch_tags(feed_tag())",
+        ],
+        check=True,
+        cwd=Path(settings.BASE_DIR),
+        env={**os.environ, "DJANGO_SETTINGS_MODULE": "blogicum.settings"},
+    )
+    assert "Новый заголовок" in client.get("/feed/").content.decode(), (
+        "Убедитесь, что кэш общий для веб-процессов и фоновых команд."
+    )
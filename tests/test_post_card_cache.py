@@ -0,0 +1,38 @@
+import pytest
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_card_cache_follows_edits_and_comments(
+        client, post_with_published_location, mixer: Mixer
+):
+    post = post_with_published_location
+    assert post.title in client.get("/").content.decode()
+
+    post.title = "Заголовок после редактирования"
+    post.save()
+    content = client.get("/").content.decode()
+    assert post.title in content, (
+        "Убедитесь, что после редактирования публикации карточка в ленте"
+        " не берётся из устаревшего кэша."
+    )
+    assert "Комментарии (0)" in content
+
+    mixer.blend("blog.Comment", post=post)
+    assert "Комментарии (1)" in client.get("/").content.decode(), (
+        "Убедитесь, что новый комментарий сбрасывает кэш карточки поста."
+    )
+
+
+def test_post_card_cache_follows_category_slug(
+        client, post_with_published_location
+):
+    category = post_with_published_location.category
+    client.get("/")
+    category.slug = "renamed-category"
+    category.save()
+    assert "/category/renamed-category/" in client.get("/").content.decode(), (
+        "Убедитесь, что после смены адреса категории карточка поста"
+        " ссылается на новый адрес."
+    )
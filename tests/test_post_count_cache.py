@@ -0,0 +1,83 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response, [
+        query["sql"] for query in context.captured_queries
+        if "COUNT(" in query["sql"]
+    ]
+
+
+def test_paginator_count_is_cached(
+        another_user_client, many_posts_with_published_locations,
+        published_category, user, mixer: Mixer
+):
+    client = another_user_client
+    url = "/"
+    _, first = count_queries(client, url)
+    assert first, "Количество публикаций должно считаться при промахе кэша."
+
+    response, second = count_queries(client, url)
+    assert not second, (
+        "Убедитесь, что пагинатор берёт количество публикаций из кэша."
+    )
+    assert response.context["page_obj"].paginator.num_pages == 2
+
+    mixer.cycle(N_PER_PAGE).blend(
+        "blog.Post", author=user, category=published_category
+    )
+    response, third = count_queries(client, url)
+    assert third, (
+        "Убедитесь, что сохранение публикации сбрасывает закэшированное"
+        " количество."
+    )
+    assert response.context["page_obj"].paginator.num_pages == 3
+
+
+@pytest.mark.parametrize("url", ["/category/{slug}/", "/profile/{user}/"])
+def test_stored_counter_follows_new_posts(
+        url, another_user_client, many_posts_with_published_locations,
+        published_category, user, mixer: Mixer
+):
+    client = another_user_client
+    url = url.format(slug=published_category.slug, user=user.username)
+    response, queries = count_queries(client, url)
+    assert not queries, (
+        "Убедитесь, что страницы категории и автора берут количество"
+        " публикаций из счётчика."
+    )
+    assert response.context["page_obj"].paginator.num_pages == 2
+
+    mixer.cycle(N_PER_PAGE).blend(
+        "blog.Post", author=user, category=published_category
+    )
+    response, queries = count_queries(client, url)
+    assert not queries
+    assert response.context["page_obj"].paginator.num_pages == 3, (
+        "Убедитесь, что новые публикации сразу попадают в счётчик."
+    )
+
+
+def test_category_unpublish_resets_counts(
+        another_user_client, many_posts_with_published_locations,
+        published_category
+):
+    client = another_user_client
+    url = f"/profile/{published_category.post_set.first().author.username}/"
+    response, _ = count_queries(client, url)
+    assert response.context["page_obj"].paginator.count == N_PER_PAGE * 2
+
+    published_category.is_published = False
+    published_category.save()
+    response, _ = count_queries(client, url)
+    assert response.context["page_obj"].paginator.count == 0
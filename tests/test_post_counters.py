@@ -0,0 +1,140 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_scheduled_post_enters_counters_when_published(
+        monkeypatch, many_posts_with_published_locations, published_category,
+        user, mixer: Mixer
+):
+    from blog.counters import get_post_count
+    from blog.publishing import publish_due_posts
+
+    now = timezone.now()
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=now + timedelta(hours=1),
+    )
+    assert get_post_count("category", published_category.slug) == (
+        N_PER_PAGE * 2
+    ), "Отложенная публикация не должна попадать в счётчик категории."
+    assert get_post_count("author", user.username) == N_PER_PAGE * 2
+
+    monkeypatch.setattr(timezone, "now", lambda: now + timedelta(hours=2))
+    assert publish_due_posts() == 1
+    assert get_post_count("category", published_category.slug) == (
+        N_PER_PAGE * 2 + 1
+    ), "Наступившая публикация должна попасть в счётчик категории."
+    assert get_post_count("author", user.username) == N_PER_PAGE * 2 + 1
+
+
+def test_pages_read_stored_counters(
+        another_user_client, many_posts_with_published_locations,
+        published_category, user
+):
+    for url in (
+        f"/category/{published_category.slug}/",
+        f"/profile/{user.username}/",
+    ):
+        another_user_client.get(url)
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = another_user_client.get(url)
+        assert not [
+            query for query in context.captured_queries
+            if "COUNT(" in query["sql"]
+        ], f"Страница `{url}` должна брать количество из счётчика."
+        assert response.context["page_obj"].paginator.count == N_PER_PAGE * 2
+        assert f"Публикаций: {N_PER_PAGE * 2}" in response.content.decode()
+
+
+def test_hidden_post_leaves_counters(
+        many_posts_with_published_locations, published_category, user
+):
+    from blog.counters import get_post_count
+
+    assert get_post_count("category", published_category.slug) == (
+        N_PER_PAGE * 2
+    )
+    post = many_posts_with_published_locations[0]
+    post.is_published = False
+    post.save()
+    assert get_post_count("category", published_category.slug) == (
+        N_PER_PAGE * 2 - 1
+    )
+    assert get_post_count("author", user.username) == N_PER_PAGE * 2 - 1
+
+
+def test_counters_follow_post_changes(
+        many_posts_with_published_locations, published_category,
+        another_category, user
+):
+    from blog.models import PostCounter
+
+    def stored(category):
+        return PostCounter.objects.get(category=category).count
+
+    post = many_posts_with_published_locations[0]
+    post.category = another_category
+    post.save()
+    assert stored(published_category) == N_PER_PAGE * 2 - 1
+    assert stored(another_category) == 1
+    post.delete()
+    assert stored(another_category) == 0
+    assert PostCounter.objects.get(author=user).count == N_PER_PAGE * 2 - 1
+
+    published_category.is_published = False
+    published_category.save()
+    assert stored(published_category) == 0
+    assert PostCounter.objects.get(author=user).count == 0, (
+        "Снятая с публикации категория должна уменьшить счётчик автора."
+    )
+
+
+def test_pages_do_not_write_counters(
+        client, many_posts_with_published_locations, published_category,
+        user
+):
+    from blog.models import PostCounter
+
+    PostCounter.objects.all().delete()
+    for url in (
+        f"/category/{published_category.slug}/",
+        f"/profile/{user.username}/",
+    ):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.context["page_obj"].paginator.count == N_PER_PAGE * 2
+        assert not [
+            query for query in context.captured_queries
+            if not query["sql"].startswith("SELECT")
+        ], f"Страница `{url}` не должна писать в базу при чтении."
+
+
+def test_post_due_exactly_now_is_not_yet_visible(
+        monkeypatch, published_category, user, mixer: Mixer
+):
+    from blog.publishing import publish_due_posts
+
+    now = timezone.now()
+    monkeypatch.setattr(timezone, "now", lambda: now)
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=now,
+    )
+    assert not post.is_visible, (
+        "Публикация становится видимой только после pub_date, как и"
+        " раньше (pub_date < now)."
+    )
+    assert publish_due_posts() == 0
+    monkeypatch.setattr(timezone, "now", lambda: now + timedelta(seconds=1))
+    assert publish_due_posts() == 1
@@ -0,0 +1,159 @@
+"""Ограничения количества SQL-запросов для всех адресов блога и страниц.
+
+Каждый адрес открывается с холодным кэшем на небольшом наборе данных,
+где страницы заполнены не до конца, а затем после добавления десятков
+публикаций и комментариев; количество запросов не должно измениться.
+"""
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+# Имя адреса: (шаблон адреса, метод, бюджет аноним, бюджет автор).
+ROUTES = {
+    "blog:index": ("/", "get", 3, 5),
+    "blog:search": ("/search/?q={word}", "get", 2, 4),
+    "blog:feed": ("/feed/", "get", 1, 1),
+    "blog:feed_atom": ("/feed/atom/", "get", 1, 1),
+    "blog:sitemap": ("/sitemap.xml", "get", 3, 3),
+    "blog:sitemap_section": ("/sitemap-posts-0.xml", "get", 4, 4),
+    "blog:profile": ("/profile/{username}/", "get", 4, 5),
+    "blog:profile_feed": ("/profile/{username}/feed/", "get", 2, 2),
+    "blog:profile_feed_atom": (
+        "/profile/{username}/feed/atom/", "get", 2, 2
+    ),
+    "blog:edit_profile": ("/profile/{username}/edit/", "get", 0, 2),
+    "blog:category_posts": ("/category/{slug}/", "get", 3, 5),
+    "blog:category_feed": ("/category/{slug}/feed/", "get", 2, 2),
+    "blog:category_feed_atom": ("/category/{slug}/feed/atom/", "get", 2, 2),
+    "blog:post_detail": ("/posts/{post_id}/", "get", 2, 4),
+    "blog:create_post": ("/posts/create/", "get", 0, 4),
+    "blog:edit_post": ("/posts/{post_id}/edit/", "get", 2, 7),
+    "blog:delete_post": ("/posts/{post_id}/delete/", "get", 2, 5),
+    "blog:add_comment": ("/posts/{post_id}/comment/", "post", 0, 8),
+    "blog:edit_comment": (
+        "/posts/{post_id}/edit_comment/{comment_id}/", "get", 2, 5
+    ),
+    "blog:delete_comment": (
+        "/posts/{post_id}/delete_comment/{comment_id}/", "get", 2, 5
+    ),
+    "pages:about": ("/pages/about/", "get", 0, 2),
+    "pages:rules": ("/pages/rules/", "get", 0, 2),
+}
+
+
+def add_data(mixer, user, another_user, categories, post, posts, comments):
+    from blog.models import Comment
+
+    locations = mixer.cycle(3).blend("blog.Location", is_published=True)
+    for category in categories:
+        mixer.cycle(posts).blend(
+            "blog.Post",
+            author=mixer.sequence(user, another_user),
+            category=category,
+            location=mixer.sequence(*locations),
+            is_published=True,
+        )
+    mixer.cycle(comments).blend(
+        Comment, post=post, author=mixer.sequence(user, another_user)
+    )
+
+
+@pytest.fixture
+def dataset(mixer: Mixer, user, another_user):
+    from blog.models import Comment
+
+    categories = mixer.cycle(3).blend("blog.Category", is_published=True)
+    post = mixer.blend(
+        "blog.Post", author=user, category=categories[0], is_published=True,
+        title="Контрольная публикация", text="Контрольная публикация",
+    )
+    add_data(mixer, user, another_user, categories, post, 2, 2)
+    comment = mixer.blend(Comment, post=post, author=user)
+    return {
+        "categories": categories,
+        "post": post,
+        "format": {
+            "word": "Контрольная",
+            "username": user.username,
+            "slug": categories[0].slug,
+            "post_id": post.pk,
+            "comment_id": comment.pk,
+        },
+    }
+
+
+def count_queries(client, name, dataset):
+    url, method, *_ = ROUTES[name]
+    url = url.format(**dataset["format"])
+    data = {"text": "Комментарий"} if method == "post" else None
+    for _ in range(2):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(client, method)(url, data)
+            if hasattr(response, "streaming_content"):
+                b"".join(response.streaming_content)
+    assert response.status_code < 400, (
+        f"Адрес `{url}` вернул статус {response.status_code}."
+    )
+    return len(context.captured_queries)
+
+
+def make_client(user, logged_in):
+    client = Client()
+    if logged_in:
+        client.force_login(user)
+    return client
+
+
+def test_every_route_has_budget():
+    names = set()
+    for namespace in ("blog", "pages"):
+        resolver = get_resolver().namespace_dict[namespace][1]
+        names |= {
+            f"{namespace}:{name}" for name in resolver.reverse_dict
+            if isinstance(name, str)
+        }
+    assert names == set(ROUTES), (
+        "Укажите бюджет запросов для каждого адреса блога и страниц."
+    )
+
+
+@pytest.mark.parametrize("logged_in", [False, True], ids=["аноним", "автор"])
+@pytest.mark.parametrize("name", ROUTES)
+def test_query_budget(
+        name, logged_in, dataset, user, another_user, mixer, settings
+):
+    budget = ROUTES[name][3 if logged_in else 2]
+    client = make_client(user, logged_in)
+    queries = count_queries(client, name, dataset)
+    assert queries <= budget, (
+        f"Адрес `{name}` выполняет {queries} SQL-запросов при бюджете"
+        f" {budget}."
+    )
+
+    add_data(
+        mixer, user, another_user, dataset["categories"], dataset["post"],
+        posts=settings.POSTS_PER_PAGE + 2,
+        comments=settings.COMMENTS_PER_PAGE + 5,
+    )
+    assert count_queries(client, name, dataset) == queries, (
+        f"Количество запросов адреса `{name}` растёт вместе с данными."
+    )
+
+
+@pytest.mark.parametrize("slug", ["missing", "hidden"])
+def test_missing_category_stops_before_posts_query(client, mixer, slug):
+    mixer.blend("blog.Category", slug="hidden", is_published=False)
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(f"/category/{slug}/")
+    assert response.status_code == 404
+    assert len(context.captured_queries) == 1, (
+        "Убедитесь, что для несуществующей или скрытой категории страница"
+        " отвечает 404 после одного запроса, не выбирая публикации."
+    )
@@ -0,0 +1,60 @@
+import pytest
+from django.db import connection
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != "sqlite",
+        reason="Планы запросов проверяются для SQLite.",
+    ),
+]
+
+
+def get_listing_querysets(user, category):
+    from blog.models import Post
+
+    return {
+        "лента": (
+            Post.default_filters.order_by("-pub_date"),
+            "post_visible_feed_idx",
+        ),
+        "профиль": (
+            Post.default_filters.filter(author=user).order_by("-pub_date"),
+            "post_author_pub_date_idx",
+        ),
+        "свой профиль": (
+            Post.objects.filter(author=user).order_by("-pub_date"),
+            "post_author_pub_date_idx",
+        ),
+        "категория": (
+            Post.default_filters.filter(
+                category=category
+            ).order_by("-pub_date"),
+            "post_category_pub_date_idx",
+        ),
+    }
+
+
+@pytest.mark.parametrize(
+    "page", ["лента", "профиль", "свой профиль", "категория"]
+)
+def test_listing_uses_index(page, user, published_category):
+    queryset, index_name = get_listing_querysets(
+        user, published_category
+    )[page]
+    plan = queryset.explain()
+    assert f"USING INDEX {index_name}" in plan, (
+        f"Убедитесь, что запрос страницы «{page}» использует индекс"
+        f" `{index_name}`. План запроса:\n{plan}"
+    )
+    assert not [
+        line for line in plan.splitlines()
+        if "SCAN blog_post" in line and "USING" not in line
+    ], (
+        f"Запрос страницы «{page}» не должен полностью сканировать"
+        f" таблицу публикаций. План запроса:\n{plan}"
+    )
+    assert "TEMP B-TREE" not in plan, (
+        f"Запрос страницы «{page}» не должен сортировать публикации"
+        f" во временном B-дереве. План запроса:\n{plan}"
+    )
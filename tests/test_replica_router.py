@@ -0,0 +1,155 @@
+import sqlite3
+
+import pytest
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+
+from core import routers
+from core.routers import REPLICA_DB_ALIAS, ReplicaRouter
+
+pytestmark = [
+    pytest.mark.django_db(transaction=True),
+    pytest.mark.skipif(
+        connection.vendor != "sqlite",
+        reason="Реплика в тестах — копия файла SQLite.",
+    ),
+]
+
+
+def add_replica(path):
+    config = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": f"file:{path}?mode=ro",
+        "OPTIONS": {"uri": True},
+    }
+    connections.settings[REPLICA_DB_ALIAS] = connections.configure_settings(
+        {DEFAULT_DB_ALIAS: connections.settings[DEFAULT_DB_ALIAS],
+         REPLICA_DB_ALIAS: config}
+    )[REPLICA_DB_ALIAS]
+
+
+@pytest.fixture
+def replica_path(tmp_path):
+    routers.reset_replica_state()
+    path = tmp_path / "replica.sqlite3"
+    yield path
+    if REPLICA_DB_ALIAS in connections.settings:
+        connections[REPLICA_DB_ALIAS].close()
+        del connections[REPLICA_DB_ALIAS]
+        del connections.settings[REPLICA_DB_ALIAS]
+    routers.reset_replica_state()
+
+
+def snapshot_to_replica(path):
+    """Копирует текущее состояние основной базы во второй файл SQLite."""
+    if REPLICA_DB_ALIAS in connections.settings:
+        connections[REPLICA_DB_ALIAS].close()
+    connection.ensure_connection()
+    target = sqlite3.connect(path)
+    connection.connection.backup(target)
+    target.close()
+    add_replica(path)
+
+
+@pytest.fixture
+def stale_post(post_with_published_location, user_client, replica_path):
+    post = post_with_published_location
+    post.title = "Заголовок на реплике"
+    post.save()
+    snapshot_to_replica(replica_path)
+    post.title = "Заголовок после записи"
+    post.save()
+    return post
+
+
+def test_listing_reads_from_replica(client, stale_post):
+    content = client.get("/").content.decode()
+    assert "Заголовок на реплике" in content, (
+        "Убедитесь, что GET-запрос к ленте читает данные с реплики."
+    )
+    content = client.get(f"/posts/{stale_post.id}/").content.decode()
+    assert "Заголовок после записи" in content, (
+        "Убедитесь, что страницы не из REPLICA_VIEWS читают основную базу."
+    )
+
+
+def test_stale_replica_read_is_not_cached(client, stale_post, replica_path):
+    for path in ("/", "/feed/"):
+        response = client.get(path)
+        assert "Заголовок на реплике" in response.content.decode()
+        for header in ("ETag", "Last-Modified"):
+            assert header not in response, (
+                f"Убедитесь, что страница `{path}` с реплики не отдаёт"
+                f" {header}, иначе клиент сохранит устаревшую версию."
+            )
+    snapshot_to_replica(replica_path)
+    for path in ("/", "/feed/"):
+        assert "Заголовок после записи" in client.get(path).content.decode(), (
+            f"Убедитесь, что страница `{path}`, прочитанная с отстающей"
+            " реплики, не сохраняется в кэш под текущими версиями тегов."
+        )
+
+
+def test_counter_is_refreshed_from_primary(
+        client, stale_post, mixer, published_category
+):
+    from blog.models import PostCounter
+
+    mixer.blend(
+        "blog.Post", category=published_category, is_published=True,
+        location=stale_post.location,
+    )
+    response = client.get(f"/category/{published_category.slug}/")
+    assert response.status_code == 200
+    counter = PostCounter.objects.using(DEFAULT_DB_ALIAS).get(
+        category=published_category
+    )
+    assert counter.count == 2, (
+        "Убедитесь, что счётчик публикаций пересчитывается по основной"
+        " базе, а не по отстающей реплике."
+    )
+
+
+def test_reads_stick_to_primary_after_write(
+        user_client, stale_post, settings
+):
+    content = user_client.get("/").content.decode()
+    assert "Заголовок на реплике" in content
+    response = user_client.post(
+        f"/posts/{stale_post.id}/comment/", data={"text": "Комментарий"}
+    )
+    assert settings.REPLICA_STICKY_COOKIE in response.cookies
+    content = user_client.get("/").content.decode()
+    assert "Заголовок после записи" in content, (
+        "Убедитесь, что после записи пользователь читает из основной базы."
+    )
+
+
+def test_unavailable_replica_falls_back_to_primary(
+        client, post_with_published_location, replica_path, monkeypatch
+):
+    add_replica(replica_path)
+    response = client.get("/")
+    assert response.status_code == 200
+    assert post_with_published_location.title in response.content.decode()
+
+    def fail():
+        raise AssertionError("Недоступную реплику проверяют слишком часто.")
+
+    monkeypatch.setattr(
+        connections[REPLICA_DB_ALIAS], "ensure_connection", fail
+    )
+    assert not routers.replica_available()
+
+
+def test_router_uses_primary_for_writes_and_transactions():
+    router = ReplicaRouter()
+    token = routers.use_replica.set(True)
+    try:
+        assert router.db_for_read(None) == REPLICA_DB_ALIAS
+        assert router.db_for_write(None) == DEFAULT_DB_ALIAS
+        with transaction.atomic():
+            assert router.db_for_read(None) == DEFAULT_DB_ALIAS
+    finally:
+        routers.use_replica.reset(token)
+    assert router.db_for_read(None) == DEFAULT_DB_ALIAS
+    assert not router.allow_migrate(REPLICA_DB_ALIAS, "blog")
@@ -0,0 +1,109 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def searchable_posts(mixer: Mixer, user, published_category):
+    past = timezone.now() - timedelta(days=1)
+    kwargs = dict(author=user, category=published_category, pub_date=past)
+    return {
+        "match": mixer.blend(
+            "blog.Post", title="Звёздное небо", text="Про телескопы.",
+            **kwargs
+        ),
+        "weak": mixer.blend(
+            "blog.Post", title="Заметки", text="Однажды видел небо.",
+            **kwargs
+        ),
+        "hidden": mixer.blend(
+            "blog.Post", title="Небо без публикации", text="",
+            is_published=False, author=user, category=published_category,
+        ),
+        "future": mixer.blend(
+            "blog.Post", title="Будущее небо", text="", author=user,
+            category=published_category,
+            pub_date=timezone.now() + timedelta(days=1),
+        ),
+        "other": mixer.blend(
+            "blog.Post", title="Горы", text="Про горы.", **kwargs
+        ),
+    }
+
+
+def search(client, query):
+    response = client.get("/search/", {"q": query})
+    assert response.status_code == 200
+    return [post.pk for post in response.context["page_obj"]]
+
+
+def test_search_ranks_published_posts(client, searchable_posts):
+    found = search(client, "небо")
+    assert found == [
+        searchable_posts["match"].pk, searchable_posts["weak"].pk
+    ], (
+        "Убедитесь, что поиск находит только опубликованные посты и"
+        " ранжирует их по релевантности."
+    )
+
+
+def test_search_index_follows_saves_and_deletes(client, searchable_posts):
+    post = searchable_posts["other"]
+    post.title = "Вулканы"
+    post.save()
+    assert search(client, "вулканы") == [post.pk]
+    assert search(client, "горы") == [post.pk]
+
+    post.delete()
+    assert search(client, "вулканы") == []
+
+
+@pytest.mark.parametrize("query", ['"', "AND (", "*", "", "  "])
+def test_search_survives_odd_input(client, searchable_posts, query):
+    search(client, query)
+
+
+def test_admin_search_uses_index(admin_client, searchable_posts):
+    response = admin_client.get("/admin/blog/post/", {"q": "телескопы"})
+    assert response.status_code == 200
+    assert [post.pk for post in response.context["cl"].result_list] == [
+        searchable_posts["match"].pk
+    ]
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("Звёздное небо", "Звёздное:* & небо:*"),
+        ("( ' | ! &", ""),
+        ("a:* & b", "a:* & b:*"),
+    ],
+)
+def test_tsquery_for_postgresql(query, expected):
+    from blog.search import build_tsquery
+
+    assert build_tsquery(query) == expected, (
+        "Убедитесь, что запрос для to_tsquery собирается только из слов"
+        " ввода и не пропускает операторы PostgreSQL."
+    )
+
+
+@pytest.mark.skipif(
+    connection.vendor != "postgresql",
+    reason="GIN-индекс поиска создаётся только в PostgreSQL.",
+)
+def test_postgresql_search_uses_gin_index(searchable_posts):
+    from blog.models import Post
+
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+    assert "blog_post_search_gin_idx" in Post.objects.search(
+        "небо"
+    ).explain(), (
+        "Убедитесь, что выражение поиска совпадает с выражением GIN-индекса."
+    )
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+import re
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import connection
+from django.http import HttpResponse
+
+from core.middleware import ServerTimingMiddleware
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_server_timing_header_and_log(
+        client, caplog, post_with_published_location
+):
+    with caplog.at_level(logging.INFO, logger="core.performance"):
+        response = client.get(f"/posts/{post_with_published_location.id}/")
+    header = response.get("Server-Timing", "")
+    for metric in ("total", "db", "tpl"):
+        assert re.search(rf"\b{metric};dur=\d+\.\d", header), (
+            f"Убедитесь, что заголовок Server-Timing содержит `{metric}`."
+        )
+    queries = int(re.search(r'queries;desc="(\d+)"', header).group(1))
+    assert queries > 0
+    records = [
+        record for record in caplog.records
+        if record.name == "core.performance"
+    ]
+    assert len(records) == 1
+    assert records[0].view_name == "blog:post_detail"
+    assert records[0].db_queries == queries
+    assert "view=blog:post_detail" in records[0].getMessage()
+
+
+def test_server_timing_sampling(client, caplog, settings):
+    settings.SERVER_TIMING_SAMPLE_RATE = 0
+    with caplog.at_level(logging.INFO, logger="core.performance"):
+        response = client.get("/")
+    assert "Server-Timing" not in response, (
+        "Убедитесь, что запросы вне выборки не замеряются."
+    )
+    assert not [
+        record for record in caplog.records
+        if record.name == "core.performance"
+    ]
+
+
+def test_server_timing_header_disabled(client, caplog, settings):
+    settings.SERVER_TIMING_HEADER = False
+    with caplog.at_level(logging.INFO, logger="core.performance"):
+        response = client.get("/")
+    assert "Server-Timing" not in response, (
+        "Убедитесь, что без SERVER_TIMING_HEADER замеры не уходят клиенту."
+    )
+    assert [
+        record for record in caplog.records
+        if record.name == "core.performance"
+    ], "Убедитесь, что замеры по-прежнему пишутся в лог."
+
+
+def test_server_timing_async_counts_worker_queries(rf):
+    def query():
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+        finally:
+            connection.close()
+
+    async def get_response(request):
+        await sync_to_async(query, thread_sensitive=False)()
+        return HttpResponse()
+
+    middleware = ServerTimingMiddleware(get_response)
+    assert asyncio.iscoroutinefunction(middleware), (
+        "Убедитесь, что ServerTimingMiddleware работает в асинхронной цепочке."
+    )
+    request = rf.get("/")
+    request.resolver_match = None
+    response = async_to_sync(middleware)(request)
+    assert 'queries;desc="1"' in response["Server-Timing"], (
+        "Убедитесь, что учитываются запросы из рабочих потоков."
+    )
@@ -0,0 +1,102 @@
+import re
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_locations(content):
+    return re.findall(r"<loc>http://testserver(.*?)</loc>", content)
+
+
+def test_sitemap_shards(
+        client, settings, user, published_category,
+        many_posts_with_published_locations, mixer: Mixer
+):
+    settings.SITEMAP_SHARD_SIZE = 5
+    settings.SITEMAP_CACHE_CHUNK_SIZE = 2
+    scheduled = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(days=1),
+    )
+    response = client.get("/sitemap.xml")
+    assert response.status_code == 200
+    index = response.content.decode()
+    shards = get_locations(index)
+    assert "<lastmod>" in index, "Укажите lastmod частей карты сайта."
+    assert len([s for s in shards if "-posts-" in s]) >= 4
+
+    locations = []
+    for shard in shards:
+        response = client.get(shard)
+        assert response.status_code == 200
+        assert isinstance(response, StreamingHttpResponse), (
+            "Убедитесь, что части карты сайта отдаются потоком."
+        )
+        shard_locations = get_locations(
+            b"".join(response.streaming_content).decode()
+        )
+        assert len(shard_locations) <= settings.SITEMAP_SHARD_SIZE
+        locations += shard_locations
+
+    expected = {
+        f"/posts/{post.pk}/" for post in many_posts_with_published_locations
+    }
+    assert expected <= set(locations)
+    assert f"/posts/{scheduled.pk}/" not in locations
+    assert f"/category/{published_category.slug}/" in locations
+    assert f"/profile/{user.username}/" in locations
+    assert "/pages/about/" in locations
+
+    post_shard = next(s for s in shards if "-posts-" in s)
+    expected_content = b"".join(client.get(post_shard).streaming_content)
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(post_shard)
+        content = b"".join(response.streaming_content)
+    assert not context.captured_queries, (
+        "Убедитесь, что готовые части карты сайта берутся из кэша."
+    )
+    assert content == expected_content
+    assert client.get(
+        post_shard, HTTP_IF_NONE_MATCH=response["ETag"]
+    ).status_code == 304
+
+
+def test_sitemap_shard_is_cached_in_chunks(
+        client, settings, monkeypatch, many_posts_with_published_locations
+):
+    import blog.sitemaps
+
+    settings.SITEMAP_SHARD_SIZE = 5
+    settings.SITEMAP_CACHE_CHUNK_SIZE = 2
+    shard = next(
+        s for s in get_locations(client.get("/sitemap.xml").content.decode())
+        if "-posts-" in s
+    )
+    stored = []
+    set_cache = blog.sitemaps.cache.set
+
+    def record(key, value, *args, **kwargs):
+        if isinstance(value, str):
+            stored.append(value)
+        set_cache(key, value, *args, **kwargs)
+
+    monkeypatch.setattr(blog.sitemaps.cache, "set", record)
+    content = b"".join(client.get(shard).streaming_content).decode()
+    assert len(get_locations(content)) > settings.SITEMAP_CACHE_CHUNK_SIZE
+    assert "".join(stored) == content
+    assert all(
+        len(get_locations(chunk)) <= settings.SITEMAP_CACHE_CHUNK_SIZE
+        for chunk in stored
+    ), "Убедитесь, что часть карты сайта пишется в кэш кусками."
+
+
+def test_unknown_sitemap_shard(client, many_posts_with_published_locations):
+    assert client.get("/sitemap-posts-99999.xml").status_code == 404
+    assert client.get("/sitemap-unknown-0.xml").status_code == 404
@@ -0,0 +1,79 @@
+import sqlite3
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != "sqlite",
+        reason="Профиль SQLite проверяется только на SQLite.",
+    ),
+]
+
+PRODUCTION_DB_ALIAS = "production"
+
+
+@pytest.fixture
+def production_connection(tmp_path):
+    path = tmp_path / "production.sqlite3"
+    connections.settings[PRODUCTION_DB_ALIAS] = connections.configure_settings({
+        DEFAULT_DB_ALIAS: connections.settings[DEFAULT_DB_ALIAS],
+        PRODUCTION_DB_ALIAS: {
+            "ENGINE": "core.backends.sqlite3",
+            "NAME": str(path),
+            "OPTIONS": {
+                "init_command": ";".join(
+                    f"PRAGMA {name} = {value}" for name, value
+                    in settings.SQLITE_PRODUCTION_PRAGMAS.items()
+                ),
+                "transaction_mode": "IMMEDIATE",
+            },
+        },
+    })[PRODUCTION_DB_ALIAS]
+    connection = connections[PRODUCTION_DB_ALIAS]
+    with connection.cursor() as cursor:
+        cursor.execute("CREATE TABLE item (id integer PRIMARY KEY)")
+    yield connection, path
+    connection.close()
+    del connections[PRODUCTION_DB_ALIAS]
+    del connections.settings[PRODUCTION_DB_ALIAS]
+
+
+def test_production_profile_pragmas(production_connection):
+    connection, _ = production_connection
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA journal_mode")
+        assert cursor.fetchone()[0] == "wal"
+        cursor.execute("PRAGMA synchronous")
+        assert cursor.fetchone()[0] == 1, (
+            "Убедитесь, что профиль включает synchronous=NORMAL."
+        )
+        cursor.execute("PRAGMA busy_timeout")
+        assert cursor.fetchone()[0] == 5000
+
+
+def test_atomic_takes_write_lock_immediately(production_connection):
+    _, path = production_connection
+    other = sqlite3.connect(path, timeout=0, isolation_level=None)
+    try:
+        with transaction.atomic(using=PRODUCTION_DB_ALIAS):
+            with pytest.raises(sqlite3.OperationalError, match="locked"):
+                other.execute("INSERT INTO item DEFAULT VALUES")
+    finally:
+        other.close()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_sqlite_command(post_with_published_location):
+    out = StringIO()
+    call_command(
+        "benchmark_sqlite", readers=1, writers=1, duration=0.2, stdout=out
+    )
+    output = out.getvalue()
+    for profile in ("default", "production"):
+        assert f"Профиль {profile}:" in output
+    assert output.count("опер/с") == 4